@@ -12,8 +12,8 @@ from ...services.auth_tokens import (
     build_access_token,
     build_refresh_ttl_seconds,
 )
-from ...services.permissions import get_current_user
-from ...services.telegram_login import verify_login_payload
+from ...services.permissions import get_current_user, invalidate_user
+from ...services.telegram_login import get_bot_token, verify_login_payload
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -33,7 +33,7 @@ class RefreshPayload(BaseModel):
 
 
 def _get_bot_token() -> str:
-    token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
+    token = get_bot_token()
     if not token:
         raise HTTPException(status_code=500, detail="TELEGRAM_BOT_TOKEN is not configured.")
     return token
@@ -61,6 +61,7 @@ async def telegram_login(payload: TelegramLoginPayload) -> dict:
         payload.first_name,
         payload.last_name,
     )
+    invalidate_user(user["telegram_id"])
     access_payload = build_access_token(
         str(user["telegram_id"]),
         {
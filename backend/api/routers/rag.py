@@ -6,6 +6,7 @@ import uuid
 from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
 
 from ...rag.service import rag_service
 from ...db import rag_documents
@@ -21,23 +22,26 @@ async def upload_document(
     metadata: Optional[str] = Form(None),
 ) -> Dict[str, object]:
     """Handle file uploads and ingest them into the vector store."""
-    contents = await file.read()
-    if not contents:
-        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-
-    rag_documents.ensure_tables()
     try:
         parsed_metadata = _parse_metadata(metadata)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    stored_path = rag_service.save_upload(file.filename, contents)
+    # Copy the spooled upload to storage without loading it into memory.
+    await file.seek(0)
+    stored_path = await run_in_threadpool(rag_service.save_upload_stream, file.filename, file.file)
+    size_bytes = stored_path.stat().st_size
+    if not size_bytes:
+        stored_path.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+    rag_documents.ensure_tables()
     document_id = uuid.uuid4().hex
     file_id = rag_documents.create_file(
         original_name=file.filename,
         stored_name=stored_path.name,
         content_type=file.content_type,
-        size_bytes=len(contents),
+        size_bytes=size_bytes,
     )
     job_id = rag_documents.create_job(file_id=file_id, document_id=document_id, status="queued")
     upload_metadata = {
@@ -94,7 +98,7 @@ async def list_document_chunks(document_id: str, limit: int = 200) -> Dict[str,
     record = rag_documents.get_document_detail(document_id)
     if not record:
         raise HTTPException(status_code=404, detail=f"document {document_id} not found")
-    chunks = rag_service.list_document_chunks(document_id, limit=limit)
+    chunks = await run_in_threadpool(rag_service.list_document_chunks, document_id, limit=limit)
     return {"document_id": document_id, "chunks": chunks}
 
 
@@ -122,7 +126,7 @@ async def delete_document(document_id: str) -> Dict[str, object]:
     if not record:
         raise HTTPException(status_code=404, detail=f"document {document_id} not found")
     try:
-        deleted = rag_service.delete_document(document_id)
+        deleted = await run_in_threadpool(rag_service.delete_document, document_id)
     except KeyError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
     rag_documents.delete_document_records(document_id)
@@ -135,7 +139,7 @@ async def search_documents(query: str, top_k: int = 3) -> Dict[str, object]:
     if not query:
         raise HTTPException(status_code=400, detail="Query parameter is required.")
 
-    results = rag_service.search(query, top_k=top_k)
+    results = await rag_service.asearch(query, top_k=top_k)
     return {"query": query, "results": results}
 
 
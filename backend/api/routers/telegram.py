@@ -8,8 +8,9 @@ from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from ...db.telegram_users import set_platonus_auth, upsert_user_profile
+from ...services.permissions import invalidate_user
 from ...services.platonus_client import authenticate_platonus_user
-from ...services.telegram_login import verify_login_payload
+from ...services.telegram_login import get_bot_token, verify_login_payload
 from ...services.telegram_webapp import extract_telegram_user
 
 router = APIRouter(prefix="/telegram", tags=["telegram"])
@@ -41,7 +42,7 @@ def _is_active_student(status_name: str | None) -> bool:
 
 
 def _send_telegram_message(telegram_id: int, message: str) -> None:
-    token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
+    token = get_bot_token()
     if not token:
         logger.warning("TELEGRAM_BOT_TOKEN is not configured; skipping Telegram notify.")
         return
@@ -87,6 +88,7 @@ async def telegram_auth(payload: TelegramAuthPayload) -> dict:
         first_name=first_name,
         last_name=last_name,
     )
+    invalidate_user(telegram_id)
     if user["platonus_auth"]:
         return {
             "status": "already_authorized",
@@ -125,6 +127,7 @@ async def telegram_auth(payload: TelegramAuthPayload) -> dict:
         email=result.get("email"),
         birth_date=result.get("birthDate"),
     )
+    invalidate_user(telegram_id)
     notify_text = (
         "Успешно авторизовано. Вам доступен бот и сайт: https://academiq.tau-edu.kz/"
     )
@@ -144,7 +147,7 @@ async def telegram_auth(payload: TelegramAuthPayload) -> dict:
 
 @router.post("/login")
 async def telegram_login(payload: TelegramLoginPayload) -> dict:
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
+    bot_token = get_bot_token()
     if not bot_token:
         raise HTTPException(status_code=500, detail="TELEGRAM_BOT_TOKEN is not configured.")
 
@@ -167,6 +170,7 @@ async def telegram_login(payload: TelegramLoginPayload) -> dict:
         payload.first_name,
         payload.last_name,
     )
+    invalidate_user(user["telegram_id"])
     return {
         "status": "ok",
         "telegram_id": user["telegram_id"],
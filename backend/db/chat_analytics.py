@@ -1,13 +1,36 @@
 """Chat analytics persistence for web/API chat."""
 from __future__ import annotations
 
+import atexit
 import json
+import logging
 import os
+import threading
+import time
 import uuid
 from contextlib import contextmanager
-from typing import Any, Iterator
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
 
 import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROWS = int(os.getenv("CHAT_ANALYTICS_FLUSH_ROWS", "100"))
+FLUSH_DELAY = float(os.getenv("CHAT_ANALYTICS_FLUSH_DELAY", "0.2"))
+# Rows kept while the database is unreachable; the oldest are dropped beyond it.
+MAX_BUFFERED = int(os.getenv("CHAT_ANALYTICS_MAX_BUFFERED", "10000"))
+RETRY_DELAY = float(os.getenv("CHAT_ANALYTICS_RETRY_DELAY", "5"))
+
+# Events are buffered and inserted in batches by a daemon thread started on the
+# first event of each process; flush_chat_events() also runs at exit.
+_buffer: list[tuple] = []
+_buffer_lock = threading.Lock()
+_pending = threading.Event()
+_full = threading.Event()
+_writer: Optional[threading.Thread] = None
+_writer_pid: Optional[int] = None
 
 
 @contextmanager
@@ -76,9 +99,63 @@ def save_chat_event(
     trace: Any,
     metadata: dict[str, Any] | None,
 ) -> str:
+    """Queue an analytics event for the background writer; returns its id."""
     event_id = uuid.uuid4().hex
+    # Serialized now so later mutation of trace/metadata cannot change the row.
+    row = (
+        event_id,
+        session_id,
+        telegram_id,
+        person_id,
+        channel,
+        query,
+        response,
+        llm_model,
+        llm_used,
+        llm_error,
+        _dumps(intents),
+        _dumps(agents),
+        _dumps(trace),
+        _dumps(metadata or {}),
+        # Stamped here: a batch shares one transaction, so NOW() would tie rows.
+        datetime.now(timezone.utc),
+    )
+    _ensure_writer()
+    with _buffer_lock:
+        _buffer.append(row)
+        _trim_locked()
+        _pending.set()
+        if len(_buffer) >= FLUSH_ROWS:
+            _full.set()
+    return event_id
+
+
+def flush_chat_events() -> None:
+    """Insert every buffered event now; on failure the rows are kept for a retry."""
+    with _buffer_lock:
+        rows = _buffer[:]
+        _buffer.clear()
+        _pending.clear()
+        _full.clear()
+    if not rows:
+        return
+    try:
+        _insert_rows(rows)
+    except BaseException:
+        with _buffer_lock:
+            # Back at the head so events stay in arrival order.
+            _buffer[:0] = rows
+            _trim_locked()
+            _pending.set()
+            if len(_buffer) >= FLUSH_ROWS:
+                _full.set()
+        raise
+
+
+def _insert_rows(rows: list[tuple]) -> None:
     with _get_connection() as conn, conn.cursor() as cursor:
-        cursor.execute(
+        execute_values(
+            cursor,
             """
             INSERT INTO chat_analytics (
                 id,
@@ -94,32 +171,66 @@ def save_chat_event(
                 intents,
                 agents,
                 trace,
-                metadata
+                metadata,
+                created_at
             )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+            VALUES %s;
             """,
-            (
-                event_id,
-                session_id,
-                telegram_id,
-                person_id,
-                channel,
-                query,
-                response,
-                llm_model,
-                llm_used,
-                llm_error,
-                json.dumps(intents, ensure_ascii=False),
-                json.dumps(agents, ensure_ascii=False),
-                json.dumps(trace, ensure_ascii=False),
-                json.dumps(metadata or {}, ensure_ascii=False),
-            ),
+            rows,
+            page_size=max(FLUSH_ROWS, 1),
         )
         conn.commit()
-    return event_id
+
+
+def _ensure_writer() -> None:
+    global _writer, _writer_pid
+    if _writer is not None and _writer_pid == os.getpid():
+        return
+    with _buffer_lock:
+        if _writer is not None and _writer_pid == os.getpid():
+            return
+        if _writer_pid is None:
+            atexit.register(_flush_quietly)
+        else:
+            # Forked child: the parent still owns the rows it buffered.
+            _buffer.clear()
+        _writer = threading.Thread(target=_writer_loop, name="chat-analytics-writer", daemon=True)
+        _writer_pid = os.getpid()
+        _writer.start()
+
+
+def _trim_locked() -> None:
+    overflow = len(_buffer) - MAX_BUFFERED
+    if overflow > 0:
+        del _buffer[:overflow]
+        logger.warning("Chat analytics buffer full; dropped %s oldest events", overflow)
+
+
+def _writer_loop() -> None:
+    while True:
+        _pending.wait()
+        # Wait up to FLUSH_DELAY for more events; a full buffer flushes right away.
+        _full.wait(FLUSH_DELAY)
+        if not _flush_quietly():
+            # Rows were put back; give the database time to recover.
+            time.sleep(RETRY_DELAY)
+
+
+def _flush_quietly() -> bool:
+    try:
+        flush_chat_events()
+    except (Exception, SystemExit) as exc:  # pragma: no cover - analytics must never break chat
+        logger.warning("Chat analytics flush failed: %s", exc)
+        return False
+    return True
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
 
 
 def fetch_chat_history(telegram_id: int) -> list[dict[str, Any]]:
+    _flush_quietly()
     with _get_connection() as conn, conn.cursor() as cursor:
         cursor.execute(
             """
@@ -171,6 +282,7 @@ def fetch_chat_history(telegram_id: int) -> list[dict[str, Any]]:
 
 
 def fetch_session_history(session_id: str, limit: int = 20) -> list[dict[str, Any]]:
+    _flush_quietly()
     with _get_connection() as conn, conn.cursor() as cursor:
         cursor.execute(
             """
@@ -2,11 +2,29 @@
 from __future__ import annotations
 
 import os
+import threading
 import uuid
 from contextlib import contextmanager
 from typing import Iterator, Optional
 
 import psycopg2
+from psycopg2 import pool as pg_pool
+
+_pool: Optional[pg_pool.ThreadedConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(dsn: str) -> pg_pool.ThreadedConnectionPool:
+    # Created lazily and per process so forked workers never share sockets.
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                max_size = max(1, int(os.getenv("POSTGRES_POOL_MAX", "10")))
+                _pool = pg_pool.ThreadedConnectionPool(0, max_size, dsn)
+                _pool_pid = os.getpid()
+    return _pool
 
 
 @contextmanager
@@ -14,11 +32,24 @@ def _get_connection() -> Iterator[psycopg2.extensions.connection]:
     dsn = os.getenv("POSTGRES_DSN", "").strip()
     if not dsn:
         raise SystemExit("POSTGRES_DSN is not set.")
-    conn = psycopg2.connect(dsn)
+    pool = _get_pool(dsn)
+    try:
+        conn = pool.getconn()
+    except pg_pool.PoolError:
+        # Pool exhausted: fall back to a one-off connection rather than failing.
+        conn = psycopg2.connect(dsn)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
     try:
         yield conn
     finally:
-        conn.close()
+        if not conn.closed:
+            # Drop anything left uncommitted before the connection is reused.
+            conn.rollback()
+        pool.putconn(conn, close=bool(conn.closed))
 
 
 def ensure_tables() -> None:
@@ -133,6 +164,116 @@ def save_message(
     return message_id
 
 
+def record_user_message(
+    *,
+    telegram_id: int,
+    chat_id: int,
+    content: str,
+    history_limit: int = 5,
+) -> str:
+    """Store an incoming user message in one transaction; returns the session id.
+
+    Equivalent to get_or_create_session + save_message + touch_session +
+    clear_history_if_limit, in a single connection and commit.
+    """
+    with _get_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id
+            FROM telegram_sessions
+            WHERE telegram_id = %s AND chat_id = %s
+            ORDER BY last_message_at DESC
+            LIMIT 1;
+            """,
+            (telegram_id, chat_id),
+        )
+        row = cursor.fetchone()
+        if row:
+            session_id = row[0]
+            cursor.execute(
+                """
+                UPDATE telegram_sessions
+                SET last_message_at = NOW()
+                WHERE id = %s;
+                """,
+                (session_id,),
+            )
+        else:
+            session_id = uuid.uuid4().hex
+            cursor.execute(
+                """
+                INSERT INTO telegram_sessions (id, telegram_id, chat_id)
+                VALUES (%s, %s, %s);
+                """,
+                (session_id, telegram_id, chat_id),
+            )
+        cursor.execute(
+            """
+            INSERT INTO telegram_messages (id, session_id, telegram_id, chat_id, role, content)
+            VALUES (%s, %s, %s, %s, 'user', %s);
+            """,
+            (uuid.uuid4().hex, session_id, telegram_id, chat_id, content),
+        )
+        cursor.execute(
+            """
+            DELETE FROM telegram_messages
+            WHERE session_id = %s
+              AND (SELECT COUNT(*) FROM telegram_messages WHERE session_id = %s) >= %s;
+            """,
+            (session_id, session_id, history_limit),
+        )
+        conn.commit()
+    return session_id
+
+
+def save_turn(
+    *,
+    session_id: str,
+    telegram_id: int,
+    chat_id: int,
+    user_text: str,
+    assistant_text: str,
+    history_limit: int = 5,
+) -> bool:
+    """Store a user message and its reply in one transaction.
+
+    Equivalent to two save_message calls, touch_session and
+    clear_history_if_limit; returns True when the history was cleared.
+    """
+    with _get_connection() as conn, conn.cursor() as cursor:
+        # NOW() is fixed per transaction; clock_timestamp() keeps the reply after the question.
+        cursor.execute(
+            """
+            INSERT INTO telegram_messages (id, session_id, telegram_id, chat_id, role, content, created_at)
+            VALUES (%s, %s, %s, %s, 'user', %s, NOW()),
+                   (%s, %s, %s, %s, 'assistant', %s, clock_timestamp());
+            """,
+            (
+                uuid.uuid4().hex, session_id, telegram_id, chat_id, user_text,
+                uuid.uuid4().hex, session_id, telegram_id, chat_id, assistant_text,
+            ),
+        )
+        cursor.execute(
+            """
+            UPDATE telegram_sessions
+            SET last_message_at = NOW()
+            WHERE id = %s;
+            """,
+            (session_id,),
+        )
+        cursor.execute(
+            """
+            DELETE FROM telegram_messages
+            WHERE session_id = %s
+              AND (SELECT COUNT(*) FROM telegram_messages WHERE session_id = %s) >= %s;
+            """,
+            (session_id, session_id, history_limit),
+        )
+        cleared = cursor.rowcount > 0
+        conn.commit()
+    return cleared
+
+
 def clear_history_if_limit(session_id: str, limit: int = 5) -> bool:
     with _get_connection() as conn, conn.cursor() as cursor:
         cursor.execute(
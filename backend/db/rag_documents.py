@@ -108,26 +108,92 @@ def update_job_status(
     error: Optional[str] = None,
     started: bool = False,
     finished: bool = False,
+) -> None:
+    with _get_connection() as conn, conn.cursor() as cursor:
+        _mark_job(
+            cursor,
+            job_id=job_id,
+            status=status,
+            error=error,
+            started=started,
+            finished=finished,
+        )
+        conn.commit()
+
+
+def _mark_job(
+    cursor: psycopg2.extensions.cursor,
+    *,
+    job_id: str,
+    status: str,
+    error: Optional[str] = None,
+    started: bool = False,
+    finished: bool = False,
 ) -> None:
     started_clause = ", started_at = COALESCE(started_at, NOW())" if started else ""
     finished_clause = ", finished_at = NOW()" if finished else ""
+    cursor.execute(
+        f"""
+        UPDATE rag_jobs
+        SET status = %s,
+            error = %s,
+            updated_at = NOW()
+            {started_clause}
+            {finished_clause}
+        WHERE id = %s;
+        """,
+        (status, error, job_id),
+    )
+
+
+def create_document(
+    *,
+    document_id: str,
+    file_id: str,
+    job_id: Optional[str],
+    chunks: int,
+    size_bytes: int,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> None:
     with _get_connection() as conn, conn.cursor() as cursor:
-        cursor.execute(
-            f"""
-            UPDATE rag_jobs
-            SET status = %s,
-                error = %s,
-                updated_at = NOW()
-                {started_clause}
-                {finished_clause}
-            WHERE id = %s;
-            """,
-            (status, error, job_id),
+        _upsert_document(
+            cursor,
+            document_id=document_id,
+            file_id=file_id,
+            job_id=job_id,
+            chunks=chunks,
+            size_bytes=size_bytes,
+            metadata=metadata,
         )
         conn.commit()
 
 
-def create_document(
+def _upsert_document(
+    cursor: psycopg2.extensions.cursor,
+    *,
+    document_id: str,
+    file_id: str,
+    job_id: Optional[str],
+    chunks: int,
+    size_bytes: int,
+    metadata: Optional[Dict[str, Any]],
+) -> None:
+    cursor.execute(
+        """
+        INSERT INTO rag_documents (document_id, file_id, job_id, chunks, size_bytes, metadata)
+        VALUES (%s, %s, %s, %s, %s, %s::jsonb)
+        ON CONFLICT (document_id) DO UPDATE
+        SET file_id = EXCLUDED.file_id,
+            job_id = EXCLUDED.job_id,
+            chunks = EXCLUDED.chunks,
+            size_bytes = EXCLUDED.size_bytes,
+            metadata = EXCLUDED.metadata;
+        """,
+        (document_id, file_id, job_id, chunks, size_bytes, json.dumps(metadata or {})),
+    )
+
+
+def finish_ingestion(
     *,
     document_id: str,
     file_id: str,
@@ -136,21 +202,19 @@ def create_document(
     size_bytes: int,
     metadata: Optional[Dict[str, Any]] = None,
 ) -> None:
-    payload = json.dumps(metadata or {})
+    """Upsert the document row and mark its job ingested in one transaction."""
     with _get_connection() as conn, conn.cursor() as cursor:
-        cursor.execute(
-            """
-            INSERT INTO rag_documents (document_id, file_id, job_id, chunks, size_bytes, metadata)
-            VALUES (%s, %s, %s, %s, %s, %s::jsonb)
-            ON CONFLICT (document_id) DO UPDATE
-            SET file_id = EXCLUDED.file_id,
-                job_id = EXCLUDED.job_id,
-                chunks = EXCLUDED.chunks,
-                size_bytes = EXCLUDED.size_bytes,
-                metadata = EXCLUDED.metadata;
-            """,
-            (document_id, file_id, job_id, chunks, size_bytes, payload),
+        _upsert_document(
+            cursor,
+            document_id=document_id,
+            file_id=file_id,
+            job_id=job_id,
+            chunks=chunks,
+            size_bytes=size_bytes,
+            metadata=metadata,
         )
+        if job_id:
+            _mark_job(cursor, job_id=job_id, status="ingested", finished=True)
         conn.commit()
 
 
@@ -1,9 +1,22 @@
 """Platonus authentication via Playwright."""
 from __future__ import annotations
 
+import hashlib
+import hmac
+import json
+import os
+import stat
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
-from playwright.sync_api import Error, TimeoutError, sync_playwright
+from playwright.sync_api import Browser, Error, TimeoutError, sync_playwright
+
+_PLATONUS_ORIGIN = "https://platonus.tau-edu.kz"
+_PERSON_ID_URL = f"{_PLATONUS_ORIGIN}/rest/api/person/personID"
+_TOKEN_SCRIPT = "() => localStorage.getItem('token') || localStorage.getItem('access_token') || ''"
 
 
 def _extract_iin(info: Any) -> str | None:
@@ -22,125 +35,287 @@ def _extract_iin(info: Any) -> str | None:
     return None
 
 
-def auth(username: str, password: str) -> dict:
+def _state_ttl() -> int:
+    return int(os.getenv("PLATONUS_STATE_TTL", "3600"))
+
+
+@lru_cache(maxsize=1)
+def _state_dir() -> Path | None:
+    """Private (0700) directory for saved sessions, or None if it is unusable."""
+    base = Path(os.getenv("PLATONUS_STATE_DIR") or tempfile.gettempdir())
+    state_dir = base / f"platonus_state_{os.getuid()}"
+    try:
+        state_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = os.lstat(state_dir)
+        # Refuse a symlink or a directory planted by another user.
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+            return None
+        if stat.S_IMODE(info.st_mode) != 0o700:
+            os.chmod(state_dir, 0o700)
+    except OSError:
+        return None
+    return state_dir
+
+
+@lru_cache(maxsize=1)
+def _state_secret() -> bytes | None:
+    secret = os.getenv("PLATONUS_STATE_SECRET", "").strip()
+    if secret:
+        return secret.encode("utf-8")
+    state_dir = _state_dir()
+    if state_dir is None:
+        return None
+    # No configured secret: keep a random one next to the sessions it protects.
+    key_path = state_dir / ".key"
+    try:
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        try:
+            key = key_path.read_bytes()
+        except OSError:
+            return None
+        return key or None
+    except OSError:
+        return None
+    key = os.urandom(32)
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(key)
+    return key
+
+
+def _state_path(username: str, password: str) -> Path | None:
+    state_dir = _state_dir()
+    secret = _state_secret()
+    if state_dir is None or secret is None:
+        return None
+    # Keyed HMAC over both credentials: a saved session is never reused for a
+    # wrong password, and the file name is useless without the secret.
+    digest = hmac.new(
+        secret, f"{username}\0{password}".encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return state_dir / f"{digest}.json"
+
+
+def _load_fresh_state(path: Path | None) -> dict | None:
+    ttl = _state_ttl()
+    if path is None or ttl <= 0:
+        return None
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path: Path | None, state: dict) -> None:
+    if path is None or _state_ttl() <= 0:
+        return
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+    except OSError:
+        pass
+
+
+def _discard_state(path: Path | None) -> None:
+    if path is None:
+        return
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
+def _person_data(response: Any) -> dict | None:
+    """personID payload of a successful response, or None for a stale session."""
+    if not response.ok:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if isinstance(data, dict) and data.get("personID"):
+        return data
+    return None
+
+
+def _state_token(state: dict) -> str:
+    for origin in state.get("origins") or []:
+        if origin.get("origin") != _PLATONUS_ORIGIN:
+            continue
+        storage = {item.get("name"): item.get("value") for item in origin.get("localStorage") or []}
+        return storage.get("token") or storage.get("access_token") or ""
+    return ""
+
+
+def _cookie_header(cookies: list) -> tuple[str, str]:
+    """Return the Cookie header and sid value from one pass over cookies."""
+    cookie_map: dict[str, str] = {}
+    parts: list[str] = []
+    for cookie in cookies:
+        name, value = cookie["name"], cookie["value"]
+        cookie_map[name] = value
+        parts.append(f"{name}={value}")
+    sid_value = cookie_map.get("plt_sid") or cookie_map.get("sid") or ""
+    return "; ".join(parts), sid_value
+
+
+def _build_headers(cookies: list, token_value: str, user_agent: str) -> dict:
+    cookie_header, sid_value = _cookie_header(cookies)
+    return {
+        "cookie": cookie_header,
+        "sid": sid_value,
+        "token": token_value,
+        "user-agent": user_agent,
+        "accept": "application/json",
+        "accept-language": "kz",
+    }
+
+
+def auth(username: str, password: str, *, reuse_session: bool = False) -> dict:
+    """Log in to Platonus and return the account's role and profile.
+
+    A saved session only proves the password was valid when it was saved, so it
+    is reused only with ``reuse_session=True`` (callers that already trust the
+    credentials). Credential checks always go through the login form; its
+    session is still saved for later reuse.
+    """
+    state_path = _state_path(username, password)
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
+        try:
+            return _auth_with_browser(
+                browser, state_path, username, password, reuse_session=reuse_session
+            )
+        finally:
+            # Closing the browser also closes every context/page opened on it.
+            browser.close()
+
+
+def _auth_with_browser(
+    browser: Browser,
+    state_path: Path | None,
+    username: str,
+    password: str,
+    *,
+    reuse_session: bool,
+) -> dict:
+    page = None
+    person_data = None
+    saved_state = _load_fresh_state(state_path) if reuse_session else None
+    if saved_state is not None:
+        context = browser.new_context(storage_state=saved_state)
+        try:
+            page = context.new_page()
+            page.set_default_timeout(60000)
+            headers = _build_headers(
+                context.cookies(_PLATONUS_ORIGIN),
+                _state_token(saved_state),
+                page.evaluate("() => navigator.userAgent"),
+            )
+            person_data = _person_data(page.request.get(_PERSON_ID_URL, headers=headers))
+        except Exception:
+            person_data = None
+        if person_data is None:
+            # Saved session is stale (401/403, HTML login page, no personID...):
+            # drop it so the next attempt does not reuse it, and log in again.
+            context.close()
+            _discard_state(state_path)
+            page = None
+
+    if page is None:
         page = browser.new_page()
         page.set_default_timeout(60000)
 
-        page.goto("https://platonus.tau-edu.kz/mail?type=1", wait_until="domcontentloaded")
+        page.goto(f"{_PLATONUS_ORIGIN}/mail?type=1", wait_until="domcontentloaded")
 
         try:
             page.wait_for_selector("#login_input", state="visible")
             page.fill("#login_input", username)
             page.fill("#pass_input", password)
         except TimeoutError as exc:
-            browser.close()
             raise RuntimeError("Login or password input not available.") from exc
 
         page.click("#Submit1")
         page.wait_for_load_state("networkidle")
 
-        cookies = page.context.cookies("https://platonus.tau-edu.kz")
-        cookie_map = {cookie["name"]: cookie["value"] for cookie in cookies}
-        cookie_header = "; ".join(
-            f"{cookie['name']}={cookie['value']}" for cookie in cookies
-        )
         user_agent = page.evaluate("() => navigator.userAgent")
-        sid_value = cookie_map.get("plt_sid") or cookie_map.get("sid") or ""
         try:
-            token_value = page.evaluate(
-                "() => localStorage.getItem('token') || localStorage.getItem('access_token') || ''"
-            )
+            token_value = page.evaluate(_TOKEN_SCRIPT)
         except Error:
             page.wait_for_load_state("domcontentloaded")
-            token_value = page.evaluate(
-                "() => localStorage.getItem('token') || localStorage.getItem('access_token') || ''"
-            )
+            token_value = page.evaluate(_TOKEN_SCRIPT)
 
-        headers = {
-            "cookie": cookie_header,
-            "sid": sid_value,
-            "token": token_value,
-            "user-agent": user_agent,
-            "accept": "application/json",
-            "accept-language": "kz",
-        }
-        person_id_response = page.request.get(
-            "https://platonus.tau-edu.kz/rest/api/person/personID",
-            headers=headers,
+        headers = _build_headers(
+            page.context.cookies(_PLATONUS_ORIGIN),
+            token_value,
+            user_agent,
         )
+        person_id_response = page.request.get(_PERSON_ID_URL, headers=headers)
+        if person_id_response.ok:
+            _save_state(state_path, page.context.storage_state())
         try:
             person_data = person_id_response.json()
         except ValueError:
-            browser.close()
             raise RuntimeError("personID response is not JSON")
-        person_id = person_data.get("personID")
-        if not person_id:
-            person_id_retry = page.request.get(
-                "https://platonus.tau-edu.kz/rest/api/person/personID",
-                headers=headers,
-            )
-            try:
-                person_data_retry = person_id_retry.json()
-            except ValueError:
-                browser.close()
-                raise RuntimeError("personID retry response is not JSON")
-            person_id = person_data_retry.get("personID")
 
-        roles_response = page.request.get(
-            "https://platonus.tau-edu.kz/rest/api/person/roles",
+    person_id = person_data.get("personID")
+    if not person_id:
+        person_id_retry = page.request.get(_PERSON_ID_URL, headers=headers)
+        try:
+            person_data_retry = person_id_retry.json()
+        except ValueError:
+            raise RuntimeError("personID retry response is not JSON")
+        person_id = person_data_retry.get("personID")
+
+    roles_response = page.request.get(
+        "https://platonus.tau-edu.kz/rest/api/person/roles",
+        headers=headers,
+    )
+    try:
+        roles_data = roles_response.json()
+    except ValueError:
+        raise RuntimeError("roles response is not JSON")
+    role_names = [
+        str(role.get("name", "")).strip().lower()
+        for role in roles_data
+        if isinstance(role, dict)
+    ]
+    if "студент" in role_names:
+        student_info_response = page.request.get(
+            f"https://platonus.tau-edu.kz/rest/student/studentInfo/{person_id}/ru",
             headers=headers,
         )
         try:
-            roles_data = roles_response.json()
+            student_info = student_info_response.json()
         except ValueError:
-            browser.close()
-            raise RuntimeError("roles response is not JSON")
-        role_names = [
-            str(role.get("name", "")).strip().lower()
-            for role in roles_data
-            if isinstance(role, dict)
-        ]
-        if "студент" in role_names:
-            student_info_response = page.request.get(
-                f"https://platonus.tau-edu.kz/rest/student/studentInfo/{person_id}/ru",
-                headers=headers,
-            )
-            try:
-                student_info = student_info_response.json()
-            except ValueError:
-                browser.close()
-                raise RuntimeError("studentInfo response is not JSON")
-            browser.close()
-            return {
-                "role": "студент",
-                "info": student_info,
-                "person_id": str(person_id) if person_id is not None else None,
-                "iin": _extract_iin(student_info),
-            }
-        if "преподаватель" in role_names:
-            employee_info_response = page.request.get(
-                f"https://platonus.tau-edu.kz/rest/employee/employeeInfo/{person_id}/3/ru?dn=1",
-                headers=headers,
-            )
-            try:
-                employee_info = employee_info_response.json()
-            except ValueError:
-                browser.close()
-                raise RuntimeError("employeeInfo response is not JSON")
-            browser.close()
-            return {
-                "role": "преподаватель",
-                "info": employee_info,
-                "person_id": str(person_id) if person_id is not None else None,
-                "iin": _extract_iin(employee_info),
-            }
-        if "деканат" in role_names:
-            browser.close()
-            raise RuntimeError("Выбран деканатский аккаунт для неверной роли.")
-        browser.close()
-        raise RuntimeError("Роль не определилась для текущего аккаунта.")
+            raise RuntimeError("studentInfo response is not JSON")
+        return {
+            "role": "студент",
+            "info": student_info,
+            "person_id": str(person_id) if person_id is not None else None,
+            "iin": _extract_iin(student_info),
+        }
+    if "преподаватель" in role_names:
+        employee_info_response = page.request.get(
+            f"https://platonus.tau-edu.kz/rest/employee/employeeInfo/{person_id}/3/ru?dn=1",
+            headers=headers,
+        )
+        try:
+            employee_info = employee_info_response.json()
+        except ValueError:
+            raise RuntimeError("employeeInfo response is not JSON")
+        return {
+            "role": "преподаватель",
+            "info": employee_info,
+            "person_id": str(person_id) if person_id is not None else None,
+            "iin": _extract_iin(employee_info),
+        }
+    if "деканат" in role_names:
+        raise RuntimeError("Выбран деканатский аккаунт для неверной роли.")
+    raise RuntimeError("Роль не определилась для текущего аккаунта.")
 
 
 def fetch_token(username: str, password: str) -> dict:
@@ -164,13 +339,8 @@ def fetch_token(username: str, password: str) -> dict:
             page.click("#Submit1")
             page.wait_for_load_state("networkidle")
 
-            cookies = page.context.cookies("https://platonus.tau-edu.kz")
-            cookie_map = {cookie["name"]: cookie["value"] for cookie in cookies}
-            cookie_header = "; ".join(
-                f"{cookie['name']}={cookie['value']}" for cookie in cookies
-            )
+            cookie_header, sid_value = _cookie_header(page.context.cookies(_PLATONUS_ORIGIN))
             user_agent = page.evaluate("() => navigator.userAgent")
-            sid_value = cookie_map.get("plt_sid") or cookie_map.get("sid") or ""
             try:
                 token_value = page.evaluate(
                     "() => localStorage.getItem('token') || localStorage.getItem('access_token') || ''"
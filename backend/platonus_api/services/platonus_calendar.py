@@ -3,6 +3,11 @@ from __future__ import annotations
 
 from html.parser import HTMLParser
 
+try:
+    from selectolax.parser import HTMLParser as _FastHTMLParser
+except ImportError:  # pragma: no cover - optional dependency
+    _FastHTMLParser = None
+
 
 def _normalize(text: str) -> str:
     return " ".join(text.split())
@@ -15,78 +20,116 @@ class _CalendarHTMLParser(HTMLParser):
         self.sections: list[dict] = []
         self._current_section: dict | None = None
         self._pending_name: str | None = None
-        self._cell_type: str | None = None
-        self._cell_parts: list[str] = []
-        self._in_header = False
-        self._header_parts: list[str] = []
-        self._in_plain_header = False
-        self._title_parts: list[str] = []
+        # One text buffer shared by whichever element is being captured:
+        # "title" (td.plainHeader), "header" (h4/h5), "name" or "value" (period cells).
+        self._mode: str | None = None
+        self._buf: list[str] = []
 
-    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
-        attrs_map = {key: value or "" for key, value in attrs}
-        class_attr = attrs_map.get("class", "")
+    def _start(self, mode: str) -> None:
+        self._mode = mode
+        self._buf = []
 
-        if tag in {"h4", "h5"}:
-            self._in_header = True
-            self._header_parts = []
-            return
+    def _finish(self) -> str:
+        text = _normalize("".join(self._buf))
+        self._mode = None
+        self._buf = []
+        return text
 
-        if tag == "td" and "plainHeader" in class_attr:
-            self._in_plain_header = True
-            self._title_parts = []
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in {"h4", "h5"}:
+            self._start("header")
             return
-
-        if tag == "td" and "tdPeriodName" in class_attr:
-            self._cell_type = "name"
-            self._cell_parts = []
+        if tag != "td":
             return
 
-        if tag == "td" and "tdPeriod" in class_attr:
-            self._cell_type = "value"
-            self._cell_parts = []
+        class_attr = ""
+        for key, value in attrs:
+            if key == "class":
+                class_attr = value or ""
+        if "plainHeader" in class_attr:
+            self._start("title")
+        elif "tdPeriodName" in class_attr:
+            self._start("name")
+        elif "tdPeriod" in class_attr:
+            self._start("value")
 
     def handle_endtag(self, tag: str) -> None:
-        if tag in {"h4", "h5"} and self._in_header:
-            title = _normalize("".join(self._header_parts))
-            self._in_header = False
+        mode = self._mode
+        if mode is None:
+            return
+
+        if tag in {"h4", "h5"}:
+            if mode != "header":
+                return
+            title = self._finish()
             if title:
                 self._current_section = {"title": title, "items": []}
                 self.sections.append(self._current_section)
             return
 
-        if tag == "td" and self._in_plain_header:
-            self._in_plain_header = False
-            self.title = _normalize("".join(self._title_parts))
+        if tag != "td" or mode == "header":
             return
-
-        if tag == "td" and self._cell_type:
-            text = _normalize("".join(self._cell_parts))
-            if self._cell_type == "name":
-                self._pending_name = text
-            elif self._cell_type == "value":
-                if self._pending_name and text:
-                    if self._current_section is None:
-                        self._current_section = {"title": "General", "items": []}
-                        self.sections.append(self._current_section)
-                    self._current_section["items"].append(
-                        {"name": self._pending_name, "period": text}
-                    )
-                self._pending_name = None
-            self._cell_type = None
-            self._cell_parts = []
+        text = self._finish()
+        if mode == "title":
+            self.title = text
+        elif mode == "name":
+            self._pending_name = text
+        else:
+            if self._pending_name and text:
+                if self._current_section is None:
+                    self._current_section = {"title": "General", "items": []}
+                    self.sections.append(self._current_section)
+                self._current_section["items"].append(
+                    {"name": self._pending_name, "period": text}
+                )
+            self._pending_name = None
 
     def handle_data(self, data: str) -> None:
-        if self._in_plain_header:
-            self._title_parts.append(data)
-            return
-        if self._in_header:
-            self._header_parts.append(data)
-            return
-        if self._cell_type:
-            self._cell_parts.append(data)
+        if self._mode is not None:
+            self._buf.append(data)
+
+
+def _parse_with_selectolax(html: str) -> dict:
+    tree = _FastHTMLParser(html)
+    root = tree.root
+    title = ""
+    sections: list[dict] = []
+    current_section: dict | None = None
+    pending_name: str | None = None
+    if root is None:
+        return {"title": title, "sections": sections}
+
+    for node in root.traverse():
+        tag = node.tag
+        if tag in {"h4", "h5"}:
+            header = _normalize(node.text(deep=True))
+            if header:
+                current_section = {"title": header, "items": []}
+                sections.append(current_section)
+            continue
+        if tag != "td":
+            continue
+
+        class_attr = node.attributes.get("class") or ""
+        if "plainHeader" in class_attr:
+            title = _normalize(node.text(deep=True))
+        elif "tdPeriodName" in class_attr:
+            pending_name = _normalize(node.text(deep=True))
+        elif "tdPeriod" in class_attr:
+            text = _normalize(node.text(deep=True))
+            if pending_name and text:
+                if current_section is None:
+                    current_section = {"title": "General", "items": []}
+                    sections.append(current_section)
+                current_section["items"].append({"name": pending_name, "period": text})
+            pending_name = None
+
+    return {"title": title, "sections": sections}
 
 
 def parse_calendar_html(html: str) -> dict:
+    if _FastHTMLParser is not None:
+        return _parse_with_selectolax(html)
     parser = _CalendarHTMLParser()
     parser.feed(html)
     return {"title": parser.title, "sections": parser.sections}
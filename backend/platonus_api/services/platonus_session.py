@@ -5,6 +5,8 @@ import asyncio
 import logging
 import os
 import time
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 from fastapi.concurrency import run_in_threadpool
@@ -14,7 +16,10 @@ from .platonus_auth import fetch_token
 logger = logging.getLogger("platonus_token")
 
 
+@lru_cache(maxsize=1)
 def _load_credentials() -> tuple[str, str]:
+    # Resolved on first use rather than at import: main.py runs load_dotenv()
+    # only after importing this module.
     login = (
         os.getenv("PLATONUS_LOGIN")
         or os.getenv("PLATONUS_ADMIN_LOGIN")
@@ -30,23 +35,40 @@ def _load_credentials() -> tuple[str, str]:
     return login, password
 
 
+def reload_credentials() -> tuple[str, str]:
+    """Drop cached Platonus credentials and read them from the env again."""
+    _load_credentials.cache_clear()
+    return _load_credentials()
+
+
+@dataclass(frozen=True, slots=True)
+class _TokenState:
+    token: str = ""
+    cookie: str = ""
+    sid: str = ""
+    user_agent: str = ""
+    last_login: float = 0.0
+
+
 class PlatonusTokenManager:
     def __init__(self, refresh_seconds: int = 1800) -> None:
         self._refresh_seconds = refresh_seconds
         self._task: Optional[asyncio.Task] = None
-        self._token = ""
-        self._cookie = ""
-        self._sid = ""
-        self._user_agent = ""
-        self._last_login = 0.0
+        # Replaced as a whole on refresh so readers never see a torn session.
+        self._state = _TokenState()
+
+    @property
+    def token(self) -> str:
+        return self._state.token
 
     def snapshot(self) -> dict:
+        state = self._state
         return {
-            "token": self._token,
-            "cookie": self._cookie,
-            "sid": self._sid,
-            "user_agent": self._user_agent,
-            "last_login": self._last_login,
+            "token": state.token,
+            "cookie": state.cookie,
+            "sid": state.sid,
+            "user_agent": state.user_agent,
+            "last_login": state.last_login,
         }
 
     async def start(self) -> None:
@@ -85,11 +107,13 @@ class PlatonusTokenManager:
             logger.warning("Platonus token was empty after login.")
             return
 
-        self._token = token
-        self._cookie = str(result.get("cookie", "")).strip()
-        self._sid = str(result.get("sid", "")).strip()
-        self._user_agent = str(result.get("user_agent", "")).strip()
-        self._last_login = time.time()
+        self._state = _TokenState(
+            token=token,
+            cookie=str(result.get("cookie", "")).strip(),
+            sid=str(result.get("sid", "")).strip(),
+            user_agent=str(result.get("user_agent", "")).strip(),
+            last_login=time.time(),
+        )
         logger.info("Platonus token refreshed.")
 
 
@@ -97,4 +121,4 @@ token_manager = PlatonusTokenManager()
 
 
 def get_platonus_token() -> str:
-    return token_manager.snapshot().get("token", "")
+    return token_manager.token
@@ -0,0 +1,197 @@
+"""Caches for RAG search results and chunk embeddings."""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SearchResults = List[Dict[str, Any]]
+
+
+class SearchCache:
+    """Exact LRU cache plus a small semantic cache keyed by query embedding.
+
+    Exact hits are keyed by the normalized query text. Semantic hits reuse the
+    results of a previous query whose embedding has cosine similarity of at
+    least ``threshold`` and was searched with the same options. Every entry
+    expires after ``ttl`` seconds; ``clear()`` drops everything (call it when
+    the indexed documents change).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        semantic_entries: int = 256,
+        threshold: float = 0.95,
+        ttl: float = 300.0,
+    ) -> None:
+        self._max_entries = max_entries
+        self._semantic_entries = semantic_entries
+        self._threshold = threshold
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._exact: "OrderedDict[Hashable, Tuple[float, SearchResults]]" = OrderedDict()
+        # Ring buffer of unit query vectors with parallel option keys/results/expiry.
+        self._vectors: Optional[np.ndarray] = None
+        self._options: List[Optional[Hashable]] = [None] * max(semantic_entries, 0)
+        self._results: List[Optional[SearchResults]] = [None] * max(semantic_entries, 0)
+        self._expires = np.zeros(max(semantic_entries, 0), dtype=np.float64)
+        self._next_slot = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.split()).lower()
+
+    def get(self, key: Hashable) -> Optional[SearchResults]:
+        if self._max_entries <= 0:
+            return None
+        with self._lock:
+            entry = self._exact.get(key)
+            if entry is None:
+                return None
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._exact[key]
+                return None
+            self._exact.move_to_end(key)
+        return _copy_results(results)
+
+    def get_similar(self, embedding: Sequence[float], options: Hashable) -> Optional[SearchResults]:
+        if self._semantic_entries <= 0:
+            return None
+        query = _unit(embedding)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                return None
+            scores = self._vectors @ query
+            now = time.monotonic()
+            for slot in np.argsort(-scores):
+                if scores[slot] < self._threshold:
+                    break
+                if self._options[slot] == options and self._expires[slot] >= now:
+                    return _copy_results(self._results[slot])
+        return None
+
+    def put(
+        self,
+        key: Hashable,
+        results: SearchResults,
+        *,
+        embedding: Optional[Sequence[float]] = None,
+        options: Optional[Hashable] = None,
+    ) -> None:
+        stored = _copy_results(results)
+        expires_at = time.monotonic() + self._ttl
+        with self._lock:
+            if self._max_entries > 0:
+                self._exact[key] = (expires_at, stored)
+                self._exact.move_to_end(key)
+                while len(self._exact) > self._max_entries:
+                    self._exact.popitem(last=False)
+            if embedding is not None and self._semantic_entries > 0:
+                vector = _unit(embedding)
+                if self._vectors is None or self._vectors.shape[1] != vector.shape[0]:
+                    self._vectors = np.zeros(
+                        (self._semantic_entries, vector.shape[0]), dtype=np.float32
+                    )
+                    self._expires[:] = 0.0
+                slot = self._next_slot
+                self._vectors[slot] = vector
+                self._options[slot] = options
+                self._results[slot] = stored
+                self._expires[slot] = expires_at
+                self._next_slot = (slot + 1) % self._semantic_entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._exact.clear()
+            self._vectors = None
+            self._options = [None] * max(self._semantic_entries, 0)
+            self._results = [None] * max(self._semantic_entries, 0)
+            self._expires[:] = 0.0
+            self._next_slot = 0
+
+
+class EmbeddingCache:
+    """Persistent SQLite cache of chunk embeddings keyed by model + content hash."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily and per process: RAGService is built at import time and
+        # SQLite connections must not be shared across a Celery fork. Within a
+        # process one connection is shared by ingestion threads under _lock.
+        if self._conn is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def key(model: str, text: str) -> bytes:
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(unique), 500):
+                batch = unique[start : start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection().execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[bytes(key)] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Sequence[Tuple[bytes, np.ndarray]]) -> None:
+        if not items:
+            return
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    row = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(row))
+    return row / norm if norm else row
+
+
+def _copy_results(results: SearchResults) -> SearchResults:
+    # Callers may mutate results (e.g. compression), so never hand out cached dicts.
+    return [{**item, "metadata": dict(item.get("metadata") or {})} for item in results]
@@ -2,12 +2,18 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, List, Set
 
 from ..langchain.llm import llm_client
 
 DEFAULT_MAX_CHARS = int(os.getenv("RAG_COMPRESSION_MAX_CHARS", "1800"))
 DEFAULT_MAX_TOKENS = int(os.getenv("RAG_COMPRESSION_MAX_TOKENS", "180"))
+MIN_SCORE = float(os.getenv("RAG_COMPRESSION_MIN_SCORE", "0.0"))
+MIN_OVERLAP = float(os.getenv("RAG_COMPRESSION_MIN_OVERLAP", "0.15"))
+STEM_LENGTH = 5
+
+_WORD_RE = re.compile(r"\w+")
 
 SYSTEM_PROMPT = (
     "You are a retrieval compressor. Extract only the minimal text spans that "
@@ -27,12 +33,15 @@ def compress_context(
     if not context or not llm_client.is_configured:
         return context
 
+    query_terms = _terms(query)
     compressed: List[Dict[str, Any]] = []
     for item in context:
         content = str(item.get("content") or "")
         if not content.strip():
             continue
         snippet = content[:max_chars]
+        if not _worth_compressing(item, query_terms, snippet):
+            continue
         compressed_text = _compress_text(query, snippet, max_tokens=max_tokens)
         if not compressed_text:
             continue
@@ -45,7 +54,32 @@ def compress_context(
         updated["metadata"] = metadata
         compressed.append(updated)
 
-    return compressed or context
+    if compressed:
+        return compressed
+    # Nothing passed the gate or the LLM: hand back only the best raw hit rather
+    # than every chunk that was just judged irrelevant.
+    return [max(context, key=_score)]
+
+
+def _score(item: Dict[str, Any]) -> float:
+    score = item.get("score")
+    return float(score) if isinstance(score, (int, float)) else float("-inf")
+
+
+def _terms(text: str) -> Set[str]:
+    # Prefix "stems" keep Russian/Kazakh inflections matching without a stemmer.
+    return {word[:STEM_LENGTH] for word in _WORD_RE.findall(text.lower()) if len(word) > 2}
+
+
+def _worth_compressing(item: Dict[str, Any], query_terms: Set[str], snippet: str) -> bool:
+    """Cheap relevance gate so obviously unrelated chunks skip the LLM call."""
+    score = item.get("score")
+    if isinstance(score, (int, float)) and score < MIN_SCORE:
+        return False
+    if not query_terms or MIN_OVERLAP <= 0:
+        return True
+    overlap = len(query_terms & _terms(snippet)) / len(query_terms)
+    return overlap >= MIN_OVERLAP
 
 
 def _compress_text(query: str, passage: str, *, max_tokens: int) -> str:
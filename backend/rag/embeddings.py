@@ -1,12 +1,14 @@
 """Embedding helpers."""
 from __future__ import annotations
 
-import math
 import os
-from typing import Iterable, List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import requests
 
+from .cache import EmbeddingCache
 from .types import DocumentChunk
 
 DEFAULT_MODEL = os.getenv("OPENAI_EMBEDDINGS_MODEL", "text-embedding-3-large")
@@ -27,11 +29,71 @@ _embedding_dimension = int(
     )
 )
 VECTOR_SIZE = _embedding_dimension if _api_key else FALLBACK_VECTOR_SIZE
+QUERY_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBED_CACHE_SIZE", "1024"))
+EMBED_BATCH_SIZE = max(1, int(os.getenv("RAG_EMBED_BATCH", "64")))
 
 
-def embed_documents(documents: Iterable[DocumentChunk]) -> List[List[float]]:
-    """Generate embeddings for provided document chunks."""
-    return [embed_text(doc.content) for doc in documents]
+class _RemoteEmbeddingUnavailable(Exception):
+    """Raised so failed remote lookups are not memoized."""
+
+
+def embed_documents(
+    documents: Iterable[DocumentChunk],
+    *,
+    cache: Optional[EmbeddingCache] = None,
+) -> np.ndarray:
+    """Generate a float32 (chunks x VECTOR_SIZE) embedding matrix.
+
+    Texts missing from the cache are sent to the API ``EMBED_BATCH_SIZE`` at a
+    time (``RAG_EMBED_BATCH``); raise it to cut round-trips on large ingests.
+    When a cache is given, remote embeddings are looked up and stored by
+    content hash; local fallback vectors are never cached.
+    """
+    texts = [doc.content for doc in documents]
+    out = np.zeros((len(texts), VECTOR_SIZE), dtype=np.float32)
+    if not _api_key:
+        for row, text in enumerate(texts):
+            _write_row(out, row, _local_embedding(text))
+        return out
+
+    keys: Optional[List[bytes]] = None
+    cached: Dict[bytes, np.ndarray] = {}
+    if cache is not None:
+        model_key = f"{_embedding_model}:{_embedding_dimension}"
+        keys = [cache.key(model_key, text) for text in texts]
+        cached = cache.get_many(keys)
+    # Distinct uncached texts -> rows they fill, so duplicates are embedded once.
+    pending: Dict[str, List[int]] = {}
+    for row, text in enumerate(texts):
+        vector = cached.get(keys[row]) if keys is not None else None
+        if vector is None:
+            pending.setdefault(text, []).append(row)
+        else:
+            _write_row(out, row, vector)
+
+    fresh: List[Tuple[bytes, np.ndarray]] = []
+    unique = list(pending)
+    for start in range(0, len(unique), EMBED_BATCH_SIZE):
+        batch = unique[start : start + EMBED_BATCH_SIZE]
+        remote_vectors = _remote_embeddings(batch)
+        for index, text in enumerate(batch):
+            rows = pending[text]
+            if not remote_vectors:
+                vector = np.asarray(_local_embedding(text), dtype=np.float32)
+            else:
+                vector = np.asarray(remote_vectors[index], dtype=np.float32)
+                if keys is not None:
+                    fresh.append((keys[rows[0]], vector))
+            for row in rows:
+                _write_row(out, row, vector)
+    if cache is not None:
+        cache.put_many(fresh)
+    return out
+
+
+def _write_row(out: np.ndarray, row: int, vector: Iterable[float]) -> None:
+    values = np.asarray(vector, dtype=np.float32)[: out.shape[1]]
+    out[row, : values.shape[0]] = values
 
 
 def embed_text(text: str) -> List[float]:
@@ -43,7 +105,33 @@ def embed_text(text: str) -> List[float]:
     return _local_embedding(text)
 
 
+def embed_query(text: str) -> List[float]:
+    """Embed a search query, memoizing results per normalized query."""
+    normalized = " ".join(text.split()).lower()
+    try:
+        return list(_embed_query_cached(normalized))
+    except _RemoteEmbeddingUnavailable:
+        return _local_embedding(normalized)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _embed_query_cached(text: str) -> Tuple[float, ...]:
+    # Tuples keep cached vectors immutable; embed_query hands out copies.
+    if not _api_key:
+        return tuple(_local_embedding(text))
+    remote_vector = _remote_embedding(text)
+    if not remote_vector:
+        raise _RemoteEmbeddingUnavailable
+    return tuple(remote_vector)
+
+
 def _remote_embedding(text: str) -> List[float]:
+    vectors = _remote_embeddings([text])
+    return vectors[0] if vectors else []
+
+
+def _remote_embeddings(texts: Sequence[str]) -> List[List[float]]:
+    """Embed several texts in one API call; returns [] on any failure."""
     endpoint = os.getenv("OPENAI_EMBEDDINGS_URL", "https://api.openai.com/v1/embeddings")
     headers = {
         "Authorization": f"Bearer {_api_key}",
@@ -53,28 +141,31 @@ def _remote_embedding(text: str) -> List[float]:
         headers["OpenAI-Organization"] = _team
     payload = {
         "model": _embedding_model,
-        "input": text or " ",
+        "input": [text or " " for text in texts],
     }
     try:
         response = requests.post(endpoint, json=payload, headers=headers, timeout=30)
         response.raise_for_status()
-        data = response.json()
-        return list(data["data"][0]["embedding"])
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        if len(data) != len(texts):
+            return []
+        return [list(item["embedding"]) for item in data]
     except (requests.RequestException, KeyError, IndexError, TypeError, ValueError):
         return []
 
 
 def _local_embedding(text: str) -> List[float]:
     dimension = VECTOR_SIZE if _api_key else FALLBACK_VECTOR_SIZE
-    vector = [0.0] * dimension
-    for character in text.lower():
-        index = ord(character) % len(vector)
-        vector[index] += 1.0
-    return _normalize(vector)
-
-
-def _normalize(vector: List[float]) -> List[float]:
-    norm = math.sqrt(sum(value * value for value in vector))
-    if norm == 0:
-        return vector
-    return [value / norm for value in vector]
+    # Same space as the original per-character loop (ord(c) % dimension), so
+    # vectors already stored by the fallback stay comparable; bincount just
+    # does the counting in C.
+    codes = np.frombuffer(
+        text.lower().encode("utf-32-le", "surrogatepass"), dtype=np.uint32
+    )
+    if codes.size == 0:
+        return [0.0] * dimension
+    vector = np.bincount(codes % dimension, minlength=dimension).astype(np.float64)
+    norm = float(np.linalg.norm(vector))
+    if norm:
+        vector /= norm
+    return vector.tolist()
@@ -1,11 +1,14 @@
 """Document loading utilities."""
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from .types import DocumentChunk
 
@@ -18,12 +21,11 @@ def load_file(
     metadata: Optional[Dict[str, Any]] = None,
     chunk_size: int = 800,
     chunk_overlap: int = 100,
-) -> List[DocumentChunk]:
-    """Load a file, normalize text and split it into chunks."""
+) -> Iterator[DocumentChunk]:
+    """Load a file, normalize text and lazily yield its chunks."""
     if not path.exists():
         raise FileNotFoundError(f"Document {path} not found")
 
-    text = _extract_text(path)
     base_metadata = {
         "file_name": path.name,
         "source_path": str(path),
@@ -33,41 +35,59 @@ def load_file(
         base_metadata.update(metadata)
 
     return _chunk_text(
-        text=text,
+        pieces=_extract_text(path),
         base_metadata=base_metadata,
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
     )
 
 
-def _extract_text(path: Path) -> str:
+def _extract_text(path: Path) -> Iterator[str]:
+    """Yield the document text piece by piece (pages, paragraphs or blocks)."""
     suffix = path.suffix.lower()
     if suffix in {".txt", ".md"}:
-        return path.read_text(encoding="utf-8")
+        yield from _read_blocks(path, errors="strict")
+        return
     if suffix == ".pdf":
         try:
             from pypdf import PdfReader
         except ImportError as exc:  # pragma: no cover - informative guard
             raise RuntimeError("pypdf is required to parse PDF files") from exc
         reader = PdfReader(str(path))
-        text = "\n".join(filter(None, (page.extract_text() or "" for page in reader.pages)))
-        if text.strip():
-            return text
-        if _ocr_enabled():
-            ocr_text = _ocr_pdf(path)
-            if ocr_text.strip():
-                return ocr_text
-        return text
+        has_text = False
+        separator = ""
+        for page in reader.pages:
+            page_text = page.extract_text() or ""
+            if not page_text:
+                continue
+            yield separator
+            yield page_text
+            separator = "\n"
+            has_text = has_text or not page_text.isspace()
+        if not has_text and _ocr_enabled():
+            yield _ocr_pdf(path)
+        return
     if suffix in {".docx", ".doc"}:
         try:
             from docx import Document
         except ImportError as exc:  # pragma: no cover
             raise RuntimeError("python-docx is required to parse DOCX files") from exc
         document = Document(str(path))
-        return "\n".join(paragraph.text for paragraph in document.paragraphs)
+        separator = ""
+        for paragraph in document.paragraphs:
+            yield separator
+            yield paragraph.text
+            separator = "\n"
+        return
 
     # fallback - treat as text
-    return path.read_text(encoding="utf-8", errors="ignore")
+    yield from _read_blocks(path, errors="ignore")
+
+
+def _read_blocks(path: Path, *, errors: str, block_size: int = 64 * 1024) -> Iterator[str]:
+    with path.open("r", encoding="utf-8", errors=errors) as handle:
+        for block in iter(lambda: handle.read(block_size), ""):
+            yield block
 
 
 def _ocr_enabled() -> bool:
@@ -84,38 +104,114 @@ def _ocr_pdf(path: Path) -> str:
         return ""
 
     lang = os.getenv("OCR_LANG", "rus+eng")
-    try:
-        images = convert_from_path(str(path))
-    except Exception:
-        logger.warning("OCR failed to render PDF for %s", path)
-        return ""
+    cache_path = _ocr_cache_path(path, lang)
+    if cache_path is not None and cache_path.exists():
+        try:
+            return cache_path.read_text(encoding="utf-8")
+        except OSError:
+            logger.warning("Failed to read OCR cache %s", cache_path)
 
-    extracted: List[str] = []
-    for image in images:
+    workers = max(1, int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1))))
+    with tempfile.TemporaryDirectory(prefix="rag_ocr_") as output_folder:
         try:
-            extracted.append(pytesseract.image_to_string(image, lang=lang))
+            # Render pages to files so workers receive paths rather than PIL images.
+            page_paths = convert_from_path(
+                str(path),
+                output_folder=output_folder,
+                fmt="png",
+                paths_only=True,
+                thread_count=workers,
+            )
         except Exception:
-            continue
-    return "\n".join(part for part in extracted if part)
+            logger.warning("OCR failed to render PDF for %s", path)
+            return ""
+
+        def _ocr_page(page_path: str) -> str:
+            try:
+                return pytesseract.image_to_string(page_path, lang=lang)
+            except Exception:
+                return ""
+
+        # Tesseract runs as a subprocess, so threads are enough to use every core
+        # (and work inside daemonic Celery worker processes).
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            extracted: List[str] = list(executor.map(_ocr_page, page_paths))
+    result = "\n".join(part for part in extracted if part)
+    if cache_path is not None and result.strip():
+        _write_ocr_cache(cache_path, result)
+    return result
+
+
+def _ocr_cache_path(path: Path, lang: str) -> Optional[Path]:
+    cache_dir = os.getenv("OCR_CACHE_DIR", "storage/ocr_cache")
+    if not cache_dir:
+        return None
+    digest = hashlib.sha256()
+    try:
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1024 * 1024), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    safe_lang = lang.replace("+", "_")
+    return Path(cache_dir) / f"{digest.hexdigest()}_{safe_lang}.txt"
+
+
+def _write_ocr_cache(cache_path: Path, text: str) -> None:
+    tmp_name = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer, so concurrent OCR of the same file in threads or
+        # processes never interleaves into one temp file.
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=cache_path.parent,
+            prefix=f".{cache_path.stem}.",
+            suffix=".tmp",
+            delete=False,
+        ) as handle:
+            tmp_name = handle.name
+            handle.write(text)
+        os.replace(tmp_name, cache_path)
+    except OSError:
+        logger.warning("Failed to write OCR cache %s", cache_path)
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
 
 
 def _chunk_text(
     *,
-    text: str,
+    pieces: Iterable[str],
     base_metadata: Dict[str, Any],
     chunk_size: int,
     chunk_overlap: int,
-) -> List[DocumentChunk]:
-    text = text.strip()
-    if not text:
-        return []
+) -> Iterator[DocumentChunk]:
+    """Yield overlapping chunks from streamed text using a rolling buffer.
 
-    chunks: List[DocumentChunk] = []
+    Produces the same windows as slicing the fully joined, stripped text:
+    leading whitespace is dropped up front and trailing whitespace only ever
+    lands in windows that are stripped (or skipped when empty) anyway.
+    """
     step = max(1, chunk_size - chunk_overlap)
-    for index, start in enumerate(range(0, len(text), step)):
-        chunk_text = text[start : start + chunk_size].strip()
-        if not chunk_text:
-            continue
+    buffer = ""
+    # Windows advance an offset into buffer; consumed text is trimmed once per
+    # piece so each character is copied a bounded number of times.
+    position = 0
+    start = 0
+    index = 0
+    skip = 0
+    started = False
+
+    def _make_chunk(chunk_text: str) -> Optional[DocumentChunk]:
+        # Only pay for strip() when a boundary character is actually whitespace.
+        if chunk_text[0].isspace() or chunk_text[-1].isspace():
+            chunk_text = chunk_text.strip()
+            if not chunk_text:
+                return None
         chunk_metadata = {
             **base_metadata,
             "chunk_index": index,
@@ -123,5 +219,40 @@ def _chunk_text(
         }
         # Qdrant requires IDs to be UUIDs or integers, so use a uuid per chunk.
         chunk_id = str(uuid.uuid4())
-        chunks.append(DocumentChunk(id=chunk_id, content=chunk_text, metadata=chunk_metadata))
-    return chunks
+        return DocumentChunk(id=chunk_id, content=chunk_text, metadata=chunk_metadata)
+
+    for piece in pieces:
+        if not piece:
+            continue
+        if not started:
+            piece = piece.lstrip()
+            if not piece:
+                continue
+            started = True
+        if skip:
+            # step > chunk_size: discard the gap between consecutive windows.
+            dropped = min(skip, len(piece))
+            piece = piece[dropped:]
+            skip -= dropped
+            if not piece:
+                continue
+        buffer = buffer[position:] + piece
+        position = 0
+        while len(buffer) - position >= chunk_size:
+            chunk = _make_chunk(buffer[position : position + chunk_size])
+            if chunk is not None:
+                yield chunk
+            skip = max(0, step - (len(buffer) - position))
+            position = min(position + step, len(buffer))
+            start += step
+            index += 1
+            if skip:
+                break
+
+    while position < len(buffer):
+        chunk = _make_chunk(buffer[position : position + chunk_size])
+        if chunk is not None:
+            yield chunk
+        position += step
+        start += step
+        index += 1
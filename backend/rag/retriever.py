@@ -14,5 +14,5 @@ def retrieve(
     top_k: int = 3,
 ) -> List[VectorSearchResult]:
     """Search the vector store for the most relevant chunks."""
-    query_embedding = embeddings.embed_text(query)
+    query_embedding = embeddings.embed_query(query)
     return store.search(query_embedding, top_k=top_k)
@@ -1,29 +1,62 @@
 """High level RAG service used by agents and API endpoints."""
 from __future__ import annotations
 
+import asyncio
+import atexit
+import hashlib
 import json
+import logging
 import os
+import shutil
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from operator import attrgetter
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 from . import embeddings, loader, retriever
+from .cache import EmbeddingCache, SearchCache
 from .compression import compress_context
+from .types import DocumentChunk
 from .vector_store import VectorStore
 
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH", "128"))
+PARALLEL_LIMIT = int(os.getenv("RAG_PARALLEL_LIMIT", "8"))
+UPLOAD_BLOCK_SIZE = 1 << 20
+MANIFEST_WRITE_DELAY = float(os.getenv("RAG_MANIFEST_WRITE_DELAY", "0.2"))
+_EPOCH = datetime(1970, 1, 1)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DocumentRecord:
+    """Immutable manifest entry; registering a document builds a new record."""
+
     document_id: str
     original_file: str
     stored_file: str
     size_bytes: int
     chunks: int
-    uploaded_at: str
+    uploaded_at_ns: int
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    @property
+    def uploaded_at(self) -> str:
+        """UTC ISO-8601 timestamp in the manifest's historical ``...Z`` format."""
+        moment = _EPOCH + timedelta(microseconds=self.uploaded_at_ns // 1000)
+        return moment.isoformat() + "Z"
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "document_id": self.document_id,
@@ -35,6 +68,10 @@ class DocumentRecord:
             "metadata": self.metadata,
         }
 
+    def to_manifest_entry(self) -> Dict[str, Any]:
+        """``to_dict()`` plus the exact nanosecond timestamp kept on disk."""
+        return {**self.to_dict(), "uploaded_at_ns": self.uploaded_at_ns}
+
 
 class RAGService:
     """Wraps loader, embeddings, vector store, and document registry."""
@@ -44,11 +81,31 @@ class RAGService:
         self.storage_dir = Path(storage_root)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.manifest_path = self.storage_dir / "manifest.json"
-        self._manifest: List[DocumentRecord] = self._load_manifest()
+        self._manifest_lock = threading.RLock()
+        self._manifest_hash: Optional[bytes] = None
+        # Manifest writes are coalesced by a daemon thread started on first change
+        # (after any Celery fork); _write_lock orders the writer and atexit flush.
+        self._write_lock = threading.Lock()
+        self._manifest_dirty = threading.Event()
+        self._manifest_writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+        # Keyed by document_id; insertion order is the on-disk manifest order.
+        self._manifest: Dict[str, DocumentRecord] = self._load_manifest()
         self.vector_store = VectorStore(
             url=os.getenv("QDRANT_URL", "http://localhost:6333"),
             collection_name=os.getenv("QDRANT_COLLECTION", "academic_documents"),
         )
+        self._embedding_cache = (
+            EmbeddingCache(self.storage_dir / "embedding_cache.sqlite3")
+            if os.getenv("RAG_EMBED_CACHE", "true").strip().lower() in {"1", "true", "yes", "on"}
+            else None
+        )
+        self._search_cache = SearchCache(
+            max_entries=int(os.getenv("RAG_SEARCH_CACHE_SIZE", "1024")),
+            semantic_entries=int(os.getenv("RAG_SEMANTIC_CACHE_SIZE", "256")),
+            threshold=float(os.getenv("RAG_SEMANTIC_CACHE_THRESHOLD", "0.95")),
+            ttl=float(os.getenv("RAG_SEARCH_CACHE_TTL", "300")),
+        )
 
     def ingest_path(
         self,
@@ -60,34 +117,108 @@ class RAGService:
         stored_file: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Load a file from disk, chunk it and add to the store."""
+        result, registration = self._ingest(
+            path,
+            metadata=metadata,
+            document_id=document_id,
+            stored_file=stored_file,
+        )
+        if register:
+            self._register_document(**registration)
+        return result
+
+    def ingest_paths(
+        self,
+        paths: Sequence[Path],
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        register: bool = False,
+        parallel_limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ingest several files concurrently, writing the manifest once."""
+        if not paths:
+            return []
+        # Every file gets its own document_id, so never share one across the batch.
+        shared_metadata = {k: v for k, v in (metadata or {}).items() if k != "document_id"}
+        workers = max(1, min(parallel_limit or PARALLEL_LIMIT, len(paths)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._ingest, Path(path), metadata=dict(shared_metadata))
+                for path in paths
+            ]
+        results: List[Dict[str, Any]] = []
+        registrations: List[Dict[str, Any]] = []
+        error: Optional[BaseException] = None
+        for future in futures:
+            try:
+                result, registration = future.result()
+            except Exception as exc:
+                error = error or exc
+                continue
+            results.append(result)
+            registrations.append(registration)
+        if register and registrations:
+            with self._manifest_lock:
+                for registration in registrations:
+                    self._register_document(**registration, save=False)
+                self._save_manifest()
+        if error is not None:
+            raise error
+        return results
+
+    def _ingest(
+        self,
+        path: Path,
+        *,
+        metadata: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None,
+        stored_file: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         doc_id = document_id or (metadata or {}).get("document_id") or uuid.uuid4().hex
         metadata_payload = dict(metadata or {})
         metadata_payload.setdefault("document_id", doc_id)
         if stored_file:
             metadata_payload.setdefault("stored_file", stored_file)
-        document_chunks = loader.load_file(path, metadata=metadata_payload)
-        vectors = embeddings.embed_documents(document_chunks)
-        for chunk, vector in zip(document_chunks, vectors):
-            self.vector_store.add(chunk, vector)
+        chunk_count = 0
+        tickets = []
+        try:
+            # Chunks are produced lazily; embed and store them batch by batch.
+            for batch in _batched(
+                loader.load_file(path, metadata=metadata_payload), INGEST_BATCH_SIZE
+            ):
+                vectors = embeddings.embed_documents(batch, cache=self._embedding_cache)
+                tickets.append(self.vector_store.add_many(batch, vectors))
+                chunk_count += len(batch)
+            # Upserts are sent in the background; wait for this file's before reporting success.
+            self.vector_store.flush(tickets)
+        except Exception:
+            # A late extraction or upsert error must not leave earlier batches
+            # searchable without a manifest entry.
+            if chunk_count:
+                try:
+                    self.vector_store.delete_document(doc_id)
+                except Exception:
+                    logger.exception("Failed to remove partial document %s", doc_id)
+            raise
+        self._search_cache.clear()
         result = {
             "document_id": doc_id,
-            "chunks": len(document_chunks),
+            "chunks": chunk_count,
             "file_name": path.name,
         }
-        if register:
-            self._register_document(
-                document_id=doc_id,
-                original_file=metadata_payload.get("original_file", path.name),
-                stored_file=stored_file or metadata_payload.get("stored_file") or path.name,
-                chunk_count=len(document_chunks),
-                size_bytes=path.stat().st_size if path.exists() else 0,
-                metadata={
-                    k: v
-                    for k, v in metadata_payload.items()
-                    if k not in {"stored_file", "document_id"}
-                },
-            )
-        return result
+        registration = {
+            "document_id": doc_id,
+            "original_file": metadata_payload.get("original_file", path.name),
+            "stored_file": stored_file or metadata_payload.get("stored_file") or path.name,
+            "chunk_count": chunk_count,
+            "size_bytes": path.stat().st_size if path.exists() else 0,
+            "metadata": {
+                k: v
+                for k, v in metadata_payload.items()
+                if k not in {"stored_file", "document_id"}
+            },
+        }
+        return result, registration
 
     def save_upload(self, filename: str, data: bytes) -> Path:
         """Persist uploaded bytes to disk."""
@@ -96,15 +227,26 @@ class RAGService:
         destination.write_bytes(data)
         return destination
 
+    def save_upload_stream(self, filename: str, stream: BinaryIO) -> Path:
+        """Copy an uploaded file object to disk in 1 MiB blocks."""
+        safe_name = f"{uuid.uuid4().hex}_{filename}"
+        destination = self.storage_dir / safe_name
+        with open(destination, "wb", buffering=UPLOAD_BLOCK_SIZE) as handle:
+            shutil.copyfileobj(stream, handle, length=UPLOAD_BLOCK_SIZE)
+        return destination
+
     def ingest_upload(
         self,
         *,
         filename: str,
-        data: bytes,
+        data: Union[bytes, BinaryIO],
         metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Persist the uploaded file and ingest it into the vector store."""
-        stored_path = self.save_upload(filename, data)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            stored_path = self.save_upload(filename, bytes(data))
+        else:
+            stored_path = self.save_upload_stream(filename, data)
         document_id = uuid.uuid4().hex
         upload_metadata = {
             "original_file": filename,
@@ -123,7 +265,7 @@ class RAGService:
 
     def list_documents(self) -> List[Dict[str, Any]]:
         """Return information about ingested documents."""
-        return [record.to_dict() for record in sorted(self._manifest, key=lambda x: x.uploaded_at, reverse=True)]
+        return [record.to_dict() for record in sorted(self._manifest.values(), key=attrgetter("uploaded_at_ns"), reverse=True)]
 
     def delete_document(self, document_id: str) -> Dict[str, Any]:
         """Delete stored file and remove vectors from the store."""
@@ -135,10 +277,17 @@ class RAGService:
         if file_path.exists():
             file_path.unlink()
         self.vector_store.delete_document(document_id)
-        self._manifest = [doc for doc in self._manifest if doc.document_id != document_id]
-        self._save_manifest()
+        self._search_cache.clear()
+        with self._manifest_lock:
+            self._manifest.pop(document_id, None)
+            self._save_manifest()
         return record.to_dict()
 
+    def flush_manifest(self) -> None:
+        """Write pending manifest changes to disk now."""
+        self._manifest_dirty.clear()
+        self._write_manifest()
+
     def search(
         self,
         query: str,
@@ -147,6 +296,16 @@ class RAGService:
         compress: bool = False,
     ) -> List[Dict[str, Any]]:
         """Retrieve relevant chunks for the provided query."""
+        options = (top_k, compress)
+        cache_key = (self._search_cache.normalize_query(query), *options)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        query_embedding = embeddings.embed_query(query)
+        cached = self._search_cache.get_similar(query_embedding, options)
+        if cached is not None:
+            return cached
+
         results = retriever.retrieve(query, self.vector_store, top_k=top_k)
         payload = [
             {
@@ -157,9 +316,24 @@ class RAGService:
             for result in results
         ]
         if compress:
-            return compress_context(query, payload)
+            payload = compress_context(query, payload)
+        if payload:
+            self._search_cache.put(cache_key, payload, embedding=query_embedding, options=options)
         return payload
 
+    async def asearch(
+        self,
+        query: str,
+        *,
+        top_k: int = 3,
+        compress: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Async ``search`` for event-loop callers; blocking work runs in a thread."""
+        cached = self._search_cache.get((self._search_cache.normalize_query(query), top_k, compress))
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.search, query, top_k=top_k, compress=compress)
+
     def list_document_chunks(self, document_id: str, *, limit: int = 200) -> List[Dict[str, Any]]:
         chunks = self.vector_store.list_document_chunks(document_id, limit=limit)
         return [
@@ -180,6 +354,7 @@ class RAGService:
         chunk_count: int,
         size_bytes: int,
         metadata: Dict[str, Any],
+        save: bool = True,
     ) -> None:
         record = DocumentRecord(
             document_id=document_id,
@@ -187,37 +362,39 @@ class RAGService:
             stored_file=stored_file,
             size_bytes=size_bytes,
             chunks=chunk_count,
-            uploaded_at=datetime.utcnow().isoformat() + "Z",
+            uploaded_at_ns=time.time_ns(),
             metadata=metadata,
         )
-        self._manifest = [doc for doc in self._manifest if doc.document_id != document_id]
-        self._manifest.append(record)
-        self._save_manifest()
+        with self._manifest_lock:
+            # Re-registering moves the record to the end, as before.
+            self._manifest.pop(document_id, None)
+            self._manifest[document_id] = record
+            if save:
+                self._save_manifest()
 
     def _find_document(self, document_id: str) -> Optional[DocumentRecord]:
-        for record in self._manifest:
-            if record.document_id == document_id:
-                return record
-        return None
+        return self._manifest.get(document_id)
 
-    def _load_manifest(self) -> List[DocumentRecord]:
+    def _load_manifest(self) -> Dict[str, DocumentRecord]:
         if not self.manifest_path.exists():
-            return []
+            return {}
         try:
-            raw = json.loads(self.manifest_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
-            return []
-        records: List[DocumentRecord] = []
+            data = self.manifest_path.read_bytes()
+            raw = _loads_manifest(data)
+        except (OSError, UnicodeDecodeError, ValueError):
+            return {}
+        self._manifest_hash = hashlib.blake2b(data).digest()
+        records: Dict[str, DocumentRecord] = {}
         for item in raw:
             try:
-                records.append(
+                records[item["document_id"]] = (
                     DocumentRecord(
                         document_id=item["document_id"],
                         original_file=item.get("original_file", ""),
                         stored_file=item.get("stored_file", ""),
                         size_bytes=item.get("size_bytes", 0),
                         chunks=item.get("chunks", 0),
-                        uploaded_at=item.get("uploaded_at", ""),
+                        uploaded_at_ns=_uploaded_at_ns(item),
                         metadata=item.get("metadata", {}),
                     )
                 )
@@ -226,8 +403,85 @@ class RAGService:
         return records
 
     def _save_manifest(self) -> None:
-        serialized = [record.to_dict() for record in self._manifest]
-        self.manifest_path.write_text(json.dumps(serialized, ensure_ascii=False, indent=2), encoding="utf-8")
+        """Schedule a manifest write; bursts of changes produce a single write."""
+        self._ensure_manifest_writer()
+        self._manifest_dirty.set()
+
+    def _ensure_manifest_writer(self) -> None:
+        if self._manifest_writer is not None and self._writer_pid == os.getpid():
+            return
+        with self._write_lock:
+            if self._manifest_writer is not None and self._writer_pid == os.getpid():
+                return
+            if self._writer_pid is None:
+                atexit.register(self.flush_manifest)
+            self._manifest_writer = threading.Thread(
+                target=self._writer_loop, name="rag-manifest-writer", daemon=True
+            )
+            self._writer_pid = os.getpid()
+            self._manifest_writer.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            self._manifest_dirty.wait()
+            time.sleep(MANIFEST_WRITE_DELAY)
+            self._manifest_dirty.clear()
+            try:
+                self._write_manifest()
+            except Exception:  # pragma: no cover - retried on the next change/exit
+                logger.exception("Failed to write RAG manifest")
+
+    def _write_manifest(self) -> None:
+        with self._write_lock:
+            with self._manifest_lock:
+                serialized = [record.to_manifest_entry() for record in self._manifest.values()]
+            data = _dumps_manifest(serialized)
+            digest = hashlib.blake2b(data).digest()
+            if digest == self._manifest_hash:
+                return
+            # Write a sibling temp file and swap it in so readers never see a torn manifest.
+            tmp_path = self.manifest_path.with_suffix(".json.tmp")
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_hash = digest
+
+
+def _dumps_manifest(serialized: List[Dict[str, Any]]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(serialized, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(serialized, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _loads_manifest(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _uploaded_at_ns(item: Dict[str, Any]) -> int:
+    value = item.get("uploaded_at_ns")
+    if isinstance(value, int):
+        return value
+    # Older manifests only stored the ISO string written by datetime.utcnow().
+    legacy = str(item.get("uploaded_at") or "").rstrip("Z")
+    try:
+        delta = datetime.fromisoformat(legacy).replace(tzinfo=None) - _EPOCH
+    except ValueError:
+        return 0
+    return (delta // timedelta(microseconds=1)) * 1000
+
+
+def _batched(chunks: Iterable[DocumentChunk], size: int) -> Iterator[List[DocumentChunk]]:
+    iterator = iter(chunks)
+    while True:
+        batch = list(islice(iterator, max(1, size)))
+        if not batch:
+            return
+        yield batch
 
 
 rag_service = RAGService()
+
@@ -2,11 +2,22 @@
 from __future__ import annotations
 
 import logging
+import math
 import os
+import queue
+import threading
 import time
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set
 
+import httpx
+import numpy as np
+
+try:
+    import grpc
+except ImportError:  # pragma: no cover - optional dependency
+    grpc = None
 from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 from qdrant_client.http.exceptions import UnexpectedResponse
@@ -16,6 +27,15 @@ from .types import DocumentChunk
 
 logger = logging.getLogger(__name__)
 
+_EPSILON = 1e-12
+_SCORE_BLOCK_ROWS = 2048
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+_FALSE_VALUES = frozenset({"0", "false", "no", "off"})
+_PAYLOAD_INDEXES = (
+    ("document_id", qdrant_models.PayloadSchemaType.KEYWORD),
+    ("chunk_index", qdrant_models.PayloadSchemaType.INTEGER),
+)
+
 
 @dataclass
 class VectorSearchResult:
@@ -23,34 +43,185 @@ class VectorSearchResult:
     score: float
 
 
+class UpsertTicket:
+    """Completion handle for the chunks queued by one ``add_many`` call.
+
+    Upsert failures are recorded only on the tickets whose chunks were in the
+    failed batch, so concurrent callers never see each other's errors.
+    """
+
+    def __init__(self, count: int) -> None:
+        self._remaining = count
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self.errors: List[BaseException] = []
+
+    def wait(self) -> None:
+        """Block until every chunk is sent; raise the first failure."""
+        self._done.wait()
+        if self.errors:
+            raise self.errors[0]
+
+    def _finish(self, count: int, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if error is not None:
+                self.errors.append(error)
+            self._remaining -= count
+            if self._remaining <= 0:
+                self._done.set()
+
+
 class InMemoryVectorStore:
-    """Simple in-memory vector store used as a fallback."""
+    """Simple in-memory vector store used as a fallback.
+
+    With ``quantize=True`` unit vectors are stored as int8 with a per-row
+    float16 scale (4x less memory than float32) and dequantized on scoring.
+    """
 
-    def __init__(self, vector_size: int) -> None:
+    def __init__(self, vector_size: int, *, quantize: bool = False) -> None:
         self._vector_size = vector_size
-        self._items: List[tuple[DocumentChunk, List[float]]] = []
+        self._quantize = quantize
+        # Guards the matrix/chunk buffers; rows are rewritten in place on delete.
+        self._lock = threading.Lock()
+        self._chunks: List[DocumentChunk] = []
+        self._id_to_row: Dict[str, int] = {}
+        # document_id -> chunk ids, so per-document operations skip a full scan.
+        self._by_doc: Dict[str, Set[str]] = defaultdict(set)
+        # Rows [0, _size) hold the (possibly quantized) unit vector of self._chunks[i];
+        # the buffer grows geometrically so add() is amortized O(1).
+        self._size = 0
+        self._matrix = np.empty(
+            (0, max(vector_size, 0)), dtype=np.int8 if quantize else np.float32
+        )
+        self._scales = np.empty(0, dtype=np.float16)
+        self._scores = np.empty(0, dtype=np.float32)
+        # float32 scratch rows for dequantizing; sized with the store, not per search.
+        self._block = np.empty((0, max(vector_size, 0)), dtype=np.float32)
 
     def add(self, chunk: DocumentChunk, vector: List[float]) -> None:
-        normalized = _normalize(_coerce_vector(vector, self._vector_size))
-        self._items.append((chunk, normalized))
+        self.add_many([chunk], [vector])
+
+    def add_many(self, chunks: Sequence[DocumentChunk], vectors: Sequence[List[float]]) -> None:
+        if not chunks:
+            return
+        rows = _coerce_matrix(vectors, self._vector_size)
+        # Norms are accumulated in float64 (the vectorized counterpart of
+        # math.fsum) once at ingest; stored rows are never renormalized.
+        norms = np.sqrt(np.einsum("ij,ij->i", rows, rows, dtype=np.float64))
+        rows /= np.maximum(norms, _EPSILON).astype(np.float32)[:, np.newaxis]
+        scales = None
+        if self._quantize:
+            rows, scales = _quantize_rows(rows)
+        with self._lock:
+            self._reserve(len(chunks))
+            targets = []
+            for chunk in chunks:
+                # Re-adding an existing id overwrites its row, like a Qdrant upsert.
+                row = self._id_to_row.get(chunk.id)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._id_to_row[chunk.id] = row
+                    self._chunks.append(chunk)
+                else:
+                    self._unindex(self._chunks[row])
+                    self._chunks[row] = chunk
+                self._by_doc[_document_key(chunk)].add(chunk.id)
+                targets.append(row)
+            self._matrix[targets] = rows
+            if scales is not None:
+                self._scales[targets] = scales
 
     def search(self, vector: List[float], *, top_k: int = 3) -> List[VectorSearchResult]:
-        if not self._items:
+        if top_k <= 0:
             return []
-        query_vector = _normalize(_coerce_vector(vector, self._vector_size))
-        results = [
-            VectorSearchResult(chunk=item[0], score=_dot(query_vector, item[1]))
-            for item in self._items
-        ]
-        results.sort(key=lambda item: item.score, reverse=True)
-        return results[:top_k]
+        query = _unit_vector(_coerce_vector(vector, self._vector_size))
+        with self._lock:
+            size = self._size
+            if not size:
+                return []
+            matrix = self._matrix[:size]
+            # Scores go straight into a buffer reused across searches, so it is
+            # only read while the lock is held.
+            scores = self._scores[:size]
+            # Rows and query are unit vectors, so cosine similarity is a plain dot product.
+            if self._quantize:
+                _quantized_scores(
+                    matrix, self._scales[:size], query, out=scores, block=self._block
+                )
+            else:
+                np.matmul(matrix, query, out=scores)
+            if top_k < size:
+                candidates = np.argpartition(scores, size - top_k)[size - top_k :]
+                order = candidates[np.argsort(-scores[candidates], kind="stable")]
+            else:
+                order = np.argsort(-scores, kind="stable")
+            return [
+                VectorSearchResult(chunk=self._chunks[row], score=float(scores[row]))
+                for row in order
+            ]
 
     def delete_document(self, document_id: str) -> None:
-        self._items = [
-            (chunk, vector)
-            for chunk, vector in self._items
-            if chunk.metadata.get("document_id") != document_id
-        ]
+        with self._lock:
+            chunk_ids = self._by_doc.pop(document_id, None)
+            if not chunk_ids:
+                return
+            rows = np.fromiter(
+                (self._id_to_row.pop(chunk_id) for chunk_id in chunk_ids),
+                dtype=np.intp,
+                count=len(chunk_ids),
+            )
+            self._compact(rows)
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        # 1.5x growth keeps inserts amortized O(1) with less slack than doubling.
+        new_capacity = max(needed, capacity + capacity // 2, 8)
+        matrix = np.empty((new_capacity, self._matrix.shape[1]), dtype=self._matrix.dtype)
+        matrix[: self._size] = self._matrix[: self._size]
+        self._matrix = matrix
+        self._scores = np.empty(new_capacity, dtype=np.float32)
+        if self._quantize:
+            scales = np.empty(new_capacity, dtype=self._scales.dtype)
+            scales[: self._size] = self._scales[: self._size]
+            self._scales = scales
+            block_rows = min(new_capacity, _SCORE_BLOCK_ROWS)
+            if self._block.shape[0] < block_rows:
+                self._block = np.empty((block_rows, self._matrix.shape[1]), dtype=np.float32)
+
+    def _compact(self, rows: np.ndarray) -> None:
+        """Remove ``rows`` by moving surviving tail rows into the holes.
+
+        One fancy-indexed copy moves all vectors, so deleting a document costs
+        O(its chunks) rather than a pass over the whole store.
+        """
+        new_size = self._size - rows.shape[0]
+        tail_removed = np.zeros(self._size - new_size, dtype=bool)
+        tail_removed[rows[rows >= new_size] - new_size] = True
+        movers = np.flatnonzero(~tail_removed) + new_size
+        holes = np.sort(rows[rows < new_size])
+        if holes.shape[0]:
+            self._matrix[holes] = self._matrix[movers]
+            if self._quantize:
+                self._scales[holes] = self._scales[movers]
+            for hole, mover in zip(holes.tolist(), movers.tolist()):
+                moved = self._chunks[mover]
+                self._chunks[hole] = moved
+                self._id_to_row[moved.id] = hole
+        del self._chunks[new_size:]
+        self._size = new_size
+
+    def _unindex(self, chunk: DocumentChunk) -> None:
+        key = _document_key(chunk)
+        chunk_ids = self._by_doc.get(key)
+        if chunk_ids is None:
+            return
+        chunk_ids.discard(chunk.id)
+        if not chunk_ids:
+            del self._by_doc[key]
 
     def list_document_chunks(
         self,
@@ -61,11 +232,11 @@ class InMemoryVectorStore:
     ) -> List[DocumentChunk]:
         if limit <= 0:
             return []
-        filtered = [
-            chunk
-            for chunk, _ in self._items
-            if chunk.metadata.get("document_id") == document_id
-        ]
+        with self._lock:
+            filtered = [
+                self._chunks[self._id_to_row[chunk_id]]
+                for chunk_id in self._by_doc.get(document_id, ())
+            ]
         filtered.sort(key=_chunk_sort_key)
         return filtered[offset : offset + limit]
 
@@ -88,55 +259,120 @@ class VectorStore:
         self._retry_delay = float(os.getenv("QDRANT_RETRY_DELAY", "0.2"))
         self._retry_max_delay = float(os.getenv("QDRANT_RETRY_MAX_DELAY", "2.0"))
 
+        self._upsert_batch = max(1, int(os.getenv("QDRANT_UPSERT_BATCH", "128")))
+        self._upsert_wait = _parse_bool(os.getenv("QDRANT_UPSERT_WAIT", "false"), default=False)
+
+        # One client per process; its httpx pool keeps connections alive between
+        # calls (qdrant-client disables keep-alive for localhost by default).
+        self._timeout = int(os.getenv("QDRANT_TIMEOUT", "30"))
+        self._http2 = _parse_bool(os.getenv("QDRANT_HTTP2", "false"), default=False)
+        self._pool_size = max(1, int(os.getenv("QDRANT_POOL_SIZE", "32")))
+        # gRPC multiplexes requests on one HTTP/2 channel and sends vectors as protobuf.
+        self._prefer_grpc = _parse_bool(os.getenv("QDRANT_PREFER_GRPC", "false"), default=False)
+        self._grpc_port = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+
+        self._hnsw_m = int(os.getenv("QDRANT_HNSW_M", "32"))
+        self._hnsw_ef_construct = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "128"))
+        self._quantization = _parse_bool(os.getenv("QDRANT_QUANTIZATION", "true"), default=True)
+        self._indexing_threshold = int(os.getenv("QDRANT_INDEXING_THRESHOLD", "20000"))
+
         self._client: Optional[QdrantClient] = None
+        # Upserts are queued and sent by a daemon thread started on first use
+        # (after any Celery fork), so ingestion is not bound by Qdrant round-trips.
+        self._pending: "queue.Queue[tuple[DocumentChunk, np.ndarray, UpsertTicket]]" = (
+            queue.Queue(maxsize=self._upsert_batch * 4)
+        )
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_lock = threading.Lock()
+        # QDRANT_FALLBACK_QUANTIZE=int8 stores fallback vectors as int8 (4x smaller).
+        quantize = os.getenv("QDRANT_FALLBACK_QUANTIZE", "").strip().lower() in {
+            "int8", "1", "true", "yes", "on"
+        }
         self._fallback_store = (
-            InMemoryVectorStore(self._vector_size) if self._fallback_enabled else None
+            InMemoryVectorStore(self._vector_size, quantize=quantize)
+            if self._fallback_enabled
+            else None
         )
 
-        self._init_qdrant()
+        # Connection attempts are serialized, and a failed attempt is not retried
+        # until QDRANT_RECONNECT_INTERVAL seconds later so a dead Qdrant does not
+        # cost every request a full retry/sleep cycle. With a fallback store,
+        # reconnects (with their retry sleeps) run on a background thread and
+        # callers use the fallback meanwhile.
+        self._reconnect_interval = float(os.getenv("QDRANT_RECONNECT_INTERVAL", "30"))
+        self._connect_lock = threading.Lock()
+        self._connector: Optional[threading.Thread] = None
+        self._connector_pid = os.getpid()
+        self._retry_after = 0.0
+        if self._fallback_enabled:
+            # One quick attempt so a healthy Qdrant is used from the first call;
+            # a down one costs a single failed connect, not the retry loop.
+            with self._connect_lock:
+                self._init_qdrant(attempts=1)
+                if self._client is None:
+                    self._schedule_reconnect()
+        else:
+            self._ensure_client()
 
     def add(self, chunk: DocumentChunk, vector: List[float]) -> None:
-        payload = {"content": chunk.content, **chunk.metadata}
-        vector_payload = _coerce_vector(vector, self._vector_size)
-
-        if self._client is None:
-            self._init_qdrant()
-        if self._client is None and self._strict:
-            raise RuntimeError("Qdrant is unavailable; strict mode enabled.")
+        self.add_many([chunk], [vector])
+
+    def add_many(
+        self, chunks: Sequence[DocumentChunk], vectors: Sequence[List[float]]
+    ) -> Optional[UpsertTicket]:
+        """Queue chunks for a background batched upsert.
+
+        Returns a ticket to pass to flush(), or None when the chunks were
+        stored synchronously in the fallback store.
+        """
+        chunks = list(chunks)
+        if not chunks:
+            return None
+        vector_payloads = _coerce_matrix(vectors, self._vector_size)
+
+        self._ensure_client()
+        self._require_backend()
         if self._client:
-            try:
-                point = qdrant_models.PointStruct(
-                    id=chunk.id,
-                    vector=vector_payload,
-                    payload=payload,
-                )
-                self._with_retry(
-                    lambda: self._client.upsert(
-                        collection_name=self._collection_name,
-                        points=[point],
-                    )
-                )
-                return
-            except Exception:
-                if self._try_reconnect():
-                    return self.add(chunk, vector_payload)
-                if not self._fallback_enabled:
-                    raise
+            self._ensure_flusher()
+            ticket = UpsertTicket(len(chunks))
+            for chunk, vector_payload in zip(chunks, vector_payloads):
+                self._pending.put((chunk, vector_payload, ticket))
+            return ticket
         if self._fallback_store:
-            self._fallback_store.add(chunk, vector_payload)
+            self._fallback_store.add_many(chunks, vector_payloads)
+        return None
+
+    def flush(self, tickets: Iterable[Optional[UpsertTicket]] = ()) -> None:
+        """Wait for queued upserts.
+
+        With tickets, wait for those chunks only and raise the first failure
+        among them. Without, wait for the whole queue; failures are left to
+        the tickets' owners.
+        """
+        tickets = [ticket for ticket in tickets if ticket is not None]
+        if not tickets:
+            if self._flusher is not None:
+                self._pending.join()
+            return
+        error: Optional[BaseException] = None
+        for ticket in tickets:
+            try:
+                ticket.wait()
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
 
     def search(self, vector: List[float], *, top_k: int = 3) -> List[VectorSearchResult]:
         vector_payload = _coerce_vector(vector, self._vector_size)
-        if self._client is None:
-            self._init_qdrant()
-        if self._client is None and self._strict:
-            raise RuntimeError("Qdrant is unavailable; strict mode enabled.")
+        self._ensure_client()
+        self._require_backend()
         if self._client:
             try:
                 hits = self._with_retry(
                     lambda: self._client.search(
                         collection_name=self._collection_name,
-                        query_vector=vector_payload,
+                        query_vector=vector_payload.tolist(),
                         limit=top_k,
                         with_payload=True,
                     )
@@ -152,10 +388,10 @@ class VectorStore:
         return []
 
     def delete_document(self, document_id: str) -> None:
-        if self._client is None:
-            self._init_qdrant()
-        if self._client is None and self._strict:
-            raise RuntimeError("Qdrant is unavailable; strict mode enabled.")
+        # Make sure no queued upsert for this document lands after the delete.
+        self.flush()
+        self._ensure_client()
+        self._require_backend()
         if self._client:
             try:
                 filter_payload = qdrant_models.Filter(
@@ -183,10 +419,8 @@ class VectorStore:
     def list_document_chunks(self, document_id: str, *, limit: int = 200) -> List[DocumentChunk]:
         if limit <= 0:
             return []
-        if self._client is None:
-            self._init_qdrant()
-        if self._client is None and self._strict:
-            raise RuntimeError("Qdrant is unavailable; strict mode enabled.")
+        self._ensure_client()
+        self._require_backend()
         if self._client:
             try:
                 filter_payload = qdrant_models.Filter(
@@ -197,26 +431,8 @@ class VectorStore:
                         )
                     ]
                 )
-                collected: List[DocumentChunk] = []
-                next_offset = None
-                while len(collected) < limit:
-                    page_limit = min(200, limit - len(collected))
-                    points, next_offset = self._with_retry(
-                        lambda: self._client.scroll(
-                            collection_name=self._collection_name,
-                            scroll_filter=filter_payload,
-                            limit=page_limit,
-                            with_payload=True,
-                            offset=next_offset,
-                        )
-                    )
-                    if not points:
-                        break
-                    collected.extend(_to_document_chunk(point) for point in points)
-                    if not next_offset:
-                        break
-                collected.sort(key=_chunk_sort_key)
-                return collected
+                # qdrant-client 1.7 has no scroll order_by, so pages are sorted here.
+                return sorted(self._scroll_document(filter_payload, limit), key=_chunk_sort_key)
             except Exception:
                 if self._try_reconnect():
                     return self.list_document_chunks(document_id, limit=limit)
@@ -226,12 +442,117 @@ class VectorStore:
             return self._fallback_store.list_document_chunks(document_id, limit=limit)
         return []
 
-    def _init_qdrant(self) -> None:
-        for attempt in range(self._retry_attempts):
+    def _scroll_document(
+        self, filter_payload: qdrant_models.Filter, limit: int
+    ) -> Iterator[DocumentChunk]:
+        remaining = limit
+        next_offset = None
+        while remaining > 0:
+            page_limit = min(200, remaining)
+            points, next_offset = self._with_retry(
+                lambda: self._client.scroll(
+                    collection_name=self._collection_name,
+                    scroll_filter=filter_payload,
+                    limit=page_limit,
+                    with_payload=True,
+                    offset=next_offset,
+                )
+            )
+            if not points:
+                return
+            remaining -= len(points)
+            for point in points:
+                yield _to_document_chunk(point)
+            if not next_offset:
+                return
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._flusher_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="qdrant-upsert", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            while len(batch) < self._upsert_batch:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            counts: Dict[UpsertTicket, int] = defaultdict(int)
+            for _, _, ticket in batch:
+                counts[ticket] += 1
+            error: Optional[BaseException] = None
+            try:
+                self._upsert_batch_points([(chunk, vector) for chunk, vector, _ in batch])
+            except Exception as exc:
+                logger.exception("Qdrant background upsert failed (%s points)", len(batch))
+                error = exc
+            finally:
+                for ticket, count in counts.items():
+                    ticket._finish(count, error)
+                for _ in batch:
+                    self._pending.task_done()
+
+    def _upsert_batch_points(self, batch: List[tuple[DocumentChunk, np.ndarray]]) -> None:
+        points = [
+            qdrant_models.PointStruct(
+                id=chunk.id,
+                # Vectors stay float32 arrays until this JSON boundary.
+                vector=vector_payload.tolist(),
+                payload={"content": chunk.content, **chunk.metadata},
+            )
+            for chunk, vector_payload in batch
+        ]
+        if self._client is not None:
+            try:
+                self._send_points(points)
+                return
+            except Exception:
+                if not self._try_reconnect():
+                    if not self._fallback_enabled:
+                        raise
+                else:
+                    try:
+                        self._send_points(points)
+                        return
+                    except Exception:
+                        if not self._fallback_enabled:
+                            raise
+        elif not self._fallback_enabled:
+            raise RuntimeError("Qdrant is unavailable; fallback disabled.")
+        if self._fallback_store:
+            self._fallback_store.add_many(
+                [chunk for chunk, _ in batch],
+                [vector_payload for _, vector_payload in batch],
+            )
+
+    def _send_points(self, points: List[qdrant_models.PointStruct]) -> None:
+        self._with_retry(
+            lambda: self._client.upsert(
+                collection_name=self._collection_name,
+                points=points,
+                wait=self._upsert_wait,
+            )
+        )
+
+    def _init_qdrant(self, attempts: Optional[int] = None) -> None:
+        attempts = attempts or self._retry_attempts
+        for attempt in range(attempts):
             try:
-                client = QdrantClient(url=self._url, api_key=self._api_key)
-                client.get_collections()
-                self._ensure_collection(client)
+                client = self._new_client()
+                try:
+                    # Doubles as the liveness probe: one request per attempt.
+                    self._ensure_collection(client)
+                except Exception:
+                    _close_quietly(client)
+                    raise
                 self._client = client
                 logger.info(
                     "Qdrant connected: url=%s collection=%s vector_size=%s strict=%s fallback=%s",
@@ -243,7 +564,7 @@ class VectorStore:
                 )
                 return
             except Exception:
-                if attempt == self._retry_attempts - 1:
+                if attempt == attempts - 1:
                     if self._strict or not self._fallback_enabled:
                         raise
                     logger.warning(
@@ -254,19 +575,90 @@ class VectorStore:
                     return
                 time.sleep(_next_delay(self._retry_delay, self._retry_max_delay, attempt))
 
-    def _try_reconnect(self) -> bool:
+    def _require_backend(self) -> None:
+        # Without a fallback store there is nowhere to serve the call from;
+        # never silently drop upserts or return empty results.
         if self._client is not None:
-            self._client = None
-        self._init_qdrant()
+            return
+        if self._strict:
+            raise RuntimeError("Qdrant is unavailable; strict mode enabled.")
+        if self._fallback_store is None:
+            raise RuntimeError("Qdrant is unavailable; fallback disabled.")
+
+    def _ensure_client(self) -> None:
+        if self._client is not None or time.monotonic() < self._retry_after:
+            return
+        if self._fallback_enabled:
+            self._schedule_reconnect()
+            return
+        with self._connect_lock:
+            if self._client is not None or time.monotonic() < self._retry_after:
+                return
+            try:
+                self._init_qdrant()
+            finally:
+                if self._client is None:
+                    self._retry_after = time.monotonic() + self._reconnect_interval
+
+    def _new_client(self) -> QdrantClient:
+        # http2 requires the optional "h2" package (httpx[http2]).
+        return QdrantClient(
+            url=self._url,
+            api_key=self._api_key,
+            timeout=self._timeout,
+            prefer_grpc=self._prefer_grpc,
+            grpc_port=self._grpc_port,
+            http2=self._http2,
+            limits=httpx.Limits(
+                max_connections=self._pool_size,
+                max_keepalive_connections=self._pool_size,
+                keepalive_expiry=60,
+            ),
+        )
+
+    def _try_reconnect(self) -> bool:
+        """Drop the client after a failed call; True if a new one is ready now."""
+        client, self._client = self._client, None
+        if client is not None:
+            _close_quietly(client)
+        self._ensure_client()
         return self._client is not None
 
+    def _schedule_reconnect(self) -> None:
+        if self._connector_pid != os.getpid():
+            # Threads and held locks do not survive a fork; start afresh.
+            self._connect_lock = threading.Lock()
+            self._connector = None
+            self._connector_pid = os.getpid()
+        with self._flusher_lock:
+            if self._connector is not None and self._connector.is_alive():
+                return
+            self._connector = threading.Thread(
+                target=self._reconnect_loop, name="qdrant-reconnect", daemon=True
+            )
+            self._connector.start()
+
+    def _reconnect_loop(self) -> None:
+        with self._connect_lock:
+            if self._client is not None or time.monotonic() < self._retry_after:
+                return
+            self._init_qdrant()
+            if self._client is None:
+                self._retry_after = time.monotonic() + self._reconnect_interval
+
     def _ensure_collection(self, client: QdrantClient) -> None:
         try:
-            exists = client.collection_exists(collection_name=self._collection_name)
-        except Exception:
-            exists = False
-        if exists:
+            info = client.get_collection(collection_name=self._collection_name)
+            self._ensure_payload_indexes(client, info.payload_schema or {})
             return
+        except UnexpectedResponse as exc:
+            if exc.status_code != 404:
+                raise
+        except ValueError:
+            pass  # local (path/":memory:") clients report a missing collection this way
+        except Exception as exc:
+            if not _is_grpc_status(exc, "NOT_FOUND"):
+                raise
         try:
             client.create_collection(
                 collection_name=self._collection_name,
@@ -274,14 +666,49 @@ class VectorStore:
                     size=self._vector_size,
                     distance=qdrant_models.Distance.COSINE,
                 ),
+                hnsw_config=qdrant_models.HnswConfigDiff(
+                    m=self._hnsw_m, ef_construct=self._hnsw_ef_construct
+                ),
+                optimizers_config=qdrant_models.OptimizersConfigDiff(
+                    indexing_threshold=self._indexing_threshold
+                ),
+                quantization_config=(
+                    qdrant_models.ScalarQuantization(
+                        scalar=qdrant_models.ScalarQuantizationConfig(
+                            type=qdrant_models.ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True,
+                        )
+                    )
+                    if self._quantization
+                    else None
+                ),
             )
             logger.info("Qdrant collection created: %s", self._collection_name)
-        except UnexpectedResponse as exc:
-            if exc.status_code == 409:
+            self._ensure_payload_indexes(client, {})
+        except Exception as exc:
+            if (
+                isinstance(exc, UnexpectedResponse) and exc.status_code == 409
+            ) or _is_grpc_status(exc, "ALREADY_EXISTS"):
                 logger.info("Qdrant collection already exists: %s", self._collection_name)
                 return
             raise
 
+    def _ensure_payload_indexes(self, client: QdrantClient, schema: Dict[str, object]) -> None:
+        # Indexed document_id makes per-document scroll/delete filters index
+        # lookups instead of full collection scans.
+        for field_name, field_schema in _PAYLOAD_INDEXES:
+            if field_name in schema:
+                continue
+            try:
+                client.create_payload_index(
+                    collection_name=self._collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
+            except Exception as exc:  # pragma: no cover - filters still work unindexed
+                logger.warning("Failed to create Qdrant payload index %s: %s", field_name, exc)
+
     def _with_retry(self, operation):
         for attempt in range(self._retry_attempts):
             try:
@@ -309,34 +736,93 @@ def _to_document_chunk(point) -> DocumentChunk:
     return DocumentChunk(id=str(point.id), content=content, metadata=metadata)
 
 
+def _document_key(chunk: DocumentChunk) -> str:
+    return chunk.metadata.get("document_id", "")
+
+
 def _chunk_sort_key(chunk: DocumentChunk) -> tuple[int, int, str]:
-    index = chunk.metadata.get("chunk_index")
-    offset = chunk.metadata.get("offset")
-    safe_index = int(index) if isinstance(index, int) or (isinstance(index, str) and index.isdigit()) else 0
-    safe_offset = int(offset) if isinstance(offset, int) or (isinstance(offset, str) and offset.isdigit()) else 0
-    return safe_index, safe_offset, chunk.id
-
-
-def _coerce_vector(vector: Iterable[float], size: int) -> List[float]:
-    result = list(vector)
-    if size <= 0:
-        return result
-    if len(result) < size:
-        result.extend([0.0] * (size - len(result)))
-    if len(result) > size:
-        result = result[:size]
+    # sort()/sorted() evaluate this once per chunk, not per comparison.
+    metadata = chunk.metadata
+    return _sort_int(metadata.get("chunk_index")), _sort_int(metadata.get("offset")), chunk.id
+
+
+def _sort_int(value: object) -> int:
+    if isinstance(value, int):
+        return int(value)
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return 0
+
+
+def _coerce_vector(vector: Iterable[float], size: int) -> np.ndarray:
+    """Return ``vector`` as float32, zero-padded or truncated to ``size``."""
+    values = np.ascontiguousarray(vector, dtype=np.float32).reshape(-1)
+    if size <= 0 or values.shape[0] == size:
+        return values
+    result = np.zeros(size, dtype=np.float32)
+    width = min(size, values.shape[0])
+    result[:width] = values[:width]
     return result
 
 
-def _dot(left: List[float], right: List[float]) -> float:
-    return sum(a * b for a, b in zip(left, right))
+def _coerce_matrix(vectors: Sequence[Iterable[float]], size: int) -> np.ndarray:
+    """Return a fresh float32 (n x size) copy of ``vectors``, padded/truncated."""
+    if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+        # embed_documents already returns a float32 matrix; avoid list round-trips.
+        rows = np.zeros((vectors.shape[0], size), dtype=np.float32)
+        width = min(size, vectors.shape[1])
+        rows[:, :width] = vectors[:, :width]
+        return rows
+    return np.asarray([_coerce_vector(vector, size) for vector in vectors], dtype=np.float32)
+
+
+def _unit_vector(vector: Iterable[float]) -> np.ndarray:
+    # Always a copy: callers' arrays must not be normalized in place.
+    row = np.array(vector, dtype=np.float32)
+    row /= max(math.sqrt(float(np.dot(row, row.astype(np.float64)))), _EPSILON)
+    return row
 
 
-def _normalize(vector: List[float]) -> List[float]:
-    norm = sum(value * value for value in vector) ** 0.5
-    if norm == 0:
-        return vector
-    return [value / norm for value in vector]
+def _quantize_rows(rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 quantization with one dequantization scale per row."""
+    peak = np.abs(rows).max(axis=1)
+    peak[peak == 0] = 1.0
+    quantized = np.clip(np.rint(rows * (127.0 / peak)[:, np.newaxis]), -127, 127).astype(np.int8)
+    return quantized, (peak / 127.0).astype(np.float16)
+
+
+def _is_grpc_status(exc: BaseException, code: str) -> bool:
+    if grpc is None or not isinstance(exc, grpc.RpcError):
+        return False
+    return exc.code() == getattr(grpc.StatusCode, code)
+
+
+def _close_quietly(client: QdrantClient) -> None:
+    try:
+        client.close()
+    except Exception:  # pragma: no cover - best effort cleanup
+        pass
+
+
+def _quantized_scores(
+    matrix: np.ndarray,
+    scales: np.ndarray,
+    query: np.ndarray,
+    *,
+    out: np.ndarray,
+    block: np.ndarray,
+) -> np.ndarray:
+    # NumPy has no fast int8 GEMV, so dequantize in cache-sized blocks instead
+    # of materializing a float32 copy of the whole matrix on every search.
+    scores = out
+    step = block.shape[0]
+    for start in range(0, matrix.shape[0], step):
+        rows = matrix[start : start + step]
+        buffer = block[: rows.shape[0]]
+        np.copyto(buffer, rows, casting="unsafe")
+        np.matmul(buffer, query, out=scores[start : start + rows.shape[0]])
+    scores *= scales
+    return scores
 
 
 def _next_delay(delay: float, max_delay: float, attempt: int) -> float:
@@ -347,8 +833,8 @@ def _parse_bool(value: str, *, default: bool = False) -> bool:
     if value is None:
         return default
     normalized = value.strip().lower()
-    if normalized in {"1", "true", "yes", "on"}:
+    if normalized in _TRUE_VALUES:
         return True
-    if normalized in {"0", "false", "no", "off"}:
+    if normalized in _FALSE_VALUES:
         return False
     return default
@@ -1,13 +1,24 @@
 """JWT helpers for Telegram auth."""
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
 import jwt
 
+_DECODE_CACHE_SIZE = int(os.getenv("JWT_DECODE_CACHE_SIZE", "4096"))
+# blake2b(token) -> verified payload. Keyed by digest so raw tokens are not retained.
+_decoded: "OrderedDict[bytes, dict[str, Any]]" = OrderedDict()
+_decoded_lock = threading.Lock()
 
+
+@lru_cache(maxsize=1)
 def _get_jwt_secret() -> str:
     secret = os.getenv("JWT_SECRET", "").strip()
     if not secret:
@@ -53,7 +64,26 @@ def build_refresh_ttl_seconds() -> int:
 
 
 def decode_access_token(token: str) -> dict[str, Any]:
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    with _decoded_lock:
+        payload = _decoded.get(key)
+        if payload is not None:
+            _decoded.move_to_end(key)
+    if payload is not None:
+        # Hits skip PyJWT, so re-apply its expiry rule (no leeway).
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            with _decoded_lock:
+                _decoded.pop(key, None)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return dict(payload)
+
     payload = jwt.decode(token, _get_jwt_secret(), algorithms=["HS256"])
     if payload.get("typ") != "access":
         raise jwt.InvalidTokenError("Invalid token type.")
+    if _DECODE_CACHE_SIZE > 0:
+        with _decoded_lock:
+            _decoded[key] = dict(payload)
+            while len(_decoded) > _DECODE_CACHE_SIZE:
+                _decoded.popitem(last=False)
     return payload
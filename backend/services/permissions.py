@@ -8,6 +8,14 @@ from fastapi import Depends, Header, HTTPException
 
 from ..db.telegram_users import get_user
 from .auth_tokens import decode_access_token
+from .ttl_cache import TTLCache
+
+# telegram_id -> user row. Writers in this process call invalidate_user();
+# changes made elsewhere (e.g. the polling worker) show up within the TTL.
+_user_cache: TTLCache[dict] = TTLCache(
+    maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+)
 
 
 def _extract_bearer_token(authorization: str | None) -> str:
@@ -43,10 +51,19 @@ def _admin_roles() -> set[str]:
 def get_current_user(authorization: str | None = Header(default=None)) -> dict:
     token = _extract_bearer_token(authorization)
     telegram_id = _get_telegram_id_from_token(token)
-    user = get_user(telegram_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found.")
-    return user
+    user = _user_cache.get(telegram_id)
+    if user is None:
+        user = get_user(telegram_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found.")
+        _user_cache.put(telegram_id, user)
+    # Copy so request handlers cannot modify the cached row.
+    return dict(user)
+
+
+def invalidate_user(telegram_id: int) -> None:
+    """Drop a cached user after its row changes."""
+    _user_cache.pop(telegram_id)
 
 
 def require_user(user: dict = Depends(get_current_user)) -> dict:
@@ -2,15 +2,43 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
 
 
 def _get_platonus_api_url() -> str:
     return os.getenv("PLATONUS_API_URL", "").strip()
 
 
+def _get_session() -> requests.Session:
+    """Pooled keep-alive session, created lazily per process (Celery forks)."""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                # Retry's default allowed_methods skips POST, so /auth is never replayed.
+                retry = Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
 def authenticate_platonus_user(login: str, password: str) -> Dict[str, Any]:
     base_url = _get_platonus_api_url()
     if not base_url:
@@ -18,7 +46,7 @@ def authenticate_platonus_user(login: str, password: str) -> Dict[str, Any]:
 
     url = f"{base_url.rstrip('/')}/auth"
     try:
-        response = requests.post(
+        response = _get_session().post(
             url,
             json={"login": login, "password": password},
             timeout=60,
@@ -52,7 +80,7 @@ def fetch_student_academic_calendar(person_id: str, lang: str = "ru") -> Dict[st
 
     url = f"{base_url.rstrip('/')}/student-academic-calendar/{person_id}"
     try:
-        response = requests.get(url, params={"lang": lang}, timeout=30)
+        response = _get_session().get(url, params={"lang": lang}, timeout=30)
         response.raise_for_status()
     except requests.RequestException as exc:
         raise RuntimeError(f"Platonus API request failed: {exc}") from exc
@@ -70,7 +98,7 @@ def fetch_platonus_session_status() -> Dict[str, Any]:
 
     url = f"{base_url.rstrip('/')}/session"
     try:
-        response = requests.get(url, timeout=15)
+        response = _get_session().get(url, timeout=15)
         response.raise_for_status()
     except requests.RequestException as exc:
         raise RuntimeError(f"Platonus API request failed: {exc}") from exc
@@ -3,17 +3,25 @@ from __future__ import annotations
 
 import hashlib
 import hmac
+import os
 import time
+from functools import lru_cache
 from typing import Any, Mapping
 
 
+@lru_cache(maxsize=1)
+def get_bot_token() -> str:
+    """TELEGRAM_BOT_TOKEN, read once per process ("" when not configured)."""
+    return os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
+
+
+@lru_cache(maxsize=4)
+def _login_secret_key(bot_token: str) -> bytes:
+    return hashlib.sha256(bot_token.encode("utf-8")).digest()
+
+
 def _normalize_payload(payload: Mapping[str, Any]) -> dict[str, str]:
-    normalized: dict[str, str] = {}
-    for key, value in payload.items():
-        if key == "hash" or value is None:
-            continue
-        normalized[key] = str(value)
-    return normalized
+    return {key: str(value) for key, value in payload.items() if key != "hash" and value is not None}
 
 
 def verify_login_payload(
@@ -41,7 +49,7 @@ def verify_login_payload(
     data_check_string = "\n".join(
         f"{key}={normalized[key]}" for key in sorted(normalized.keys())
     )
-    secret_key = hashlib.sha256(bot_token.encode("utf-8")).digest()
+    secret_key = _login_secret_key(bot_token)
     calculated_hash = hmac.new(
         secret_key, data_check_string.encode("utf-8"), hashlib.sha256
     ).hexdigest()
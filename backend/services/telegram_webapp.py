@@ -3,34 +3,85 @@ from __future__ import annotations
 
 import hashlib
 import hmac
-import os
+import json
+from functools import lru_cache
+from typing import Any
 from urllib.parse import parse_qsl
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from .telegram_login import get_bot_token
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 
 def parse_telegram_id(init_data: str) -> int | None:
+    user = _user_from_data(dict(parse_qsl(init_data, keep_blank_values=True)))
+    return user["id"] if user else None
+
+
+def parse_telegram_user(init_data: str) -> dict | None:
+    return _user_from_data(dict(parse_qsl(init_data, keep_blank_values=True)))
+
+
+def validate_init_data(init_data: str, bot_token: str) -> bool:
+    return _parse_and_validate(init_data, bot_token) is not None
+
+
+def extract_telegram_id(init_data: str) -> int | None:
+    user = extract_telegram_user(init_data)
+    return user["id"] if user else None
+
+
+def extract_telegram_user(init_data: str) -> dict | None:
+    bot_token = get_bot_token()
+    if not bot_token:
+        return None
+    data = _parse_and_validate(init_data, bot_token)
+    if data is None:
+        return None
+    user = data["user"]
+    # Copy so callers cannot modify the cached entry.
+    return dict(user) if user else None
+
+
+@lru_cache(maxsize=1024)
+def _parse_and_validate(init_data: str, bot_token: str) -> dict[str, Any] | None:
+    """Parse init data once and check its hash; returns None when invalid.
+
+    The result holds the parsed fields plus ``user`` (see _user_from_data).
+    Telegram resends identical init data on every WebApp request of a session,
+    so results are memoized.
+    """
     data = dict(parse_qsl(init_data, keep_blank_values=True))
-    user_json = data.get("user")
-    if not user_json:
+    received_hash = data.pop("hash", None)
+    if not received_hash:
         return None
-    try:
-        import json
 
-        user = json.loads(user_json)
-    except Exception:
+    pairs = [f"{key}={value}" for key, value in sorted(data.items())]
+    data_check_string = "\n".join(pairs)
+    secret_key = _webapp_secret_key(bot_token)
+    calculated_hash = hmac.new(secret_key, data_check_string.encode("utf-8"), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(calculated_hash, received_hash):
         return None
-    user_id = user.get("id")
-    return int(user_id) if isinstance(user_id, int) else None
+    data["user"] = _user_from_data(data)
+    return data
 
 
-def parse_telegram_user(init_data: str) -> dict | None:
-    data = dict(parse_qsl(init_data, keep_blank_values=True))
+@lru_cache(maxsize=4)
+def _webapp_secret_key(bot_token: str) -> bytes:
+    return hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
+
+
+def _user_from_data(data: dict[str, Any]) -> dict | None:
     user_json = data.get("user")
     if not user_json:
         return None
     try:
-        import json
-
-        user = json.loads(user_json)
+        user = _json_loads(user_json)
     except Exception:
         return None
     if not isinstance(user, dict):
@@ -44,34 +95,3 @@ def parse_telegram_user(init_data: str) -> dict | None:
         "first_name": user.get("first_name"),
         "last_name": user.get("last_name"),
     }
-
-
-def validate_init_data(init_data: str, bot_token: str) -> bool:
-    data = dict(parse_qsl(init_data, keep_blank_values=True))
-    received_hash = data.pop("hash", None)
-    if not received_hash:
-        return False
-
-    pairs = [f"{key}={value}" for key, value in sorted(data.items())]
-    data_check_string = "\n".join(pairs)
-    secret_key = hmac.new(b"WebAppData", bot_token.encode("utf-8"), hashlib.sha256).digest()
-    calculated_hash = hmac.new(secret_key, data_check_string.encode("utf-8"), hashlib.sha256).hexdigest()
-    return hmac.compare_digest(calculated_hash, received_hash)
-
-
-def extract_telegram_id(init_data: str) -> int | None:
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-    if not bot_token:
-        return None
-    if not validate_init_data(init_data, bot_token):
-        return None
-    return parse_telegram_id(init_data)
-
-
-def extract_telegram_user(init_data: str) -> dict | None:
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
-    if not bot_token:
-        return None
-    if not validate_init_data(init_data, bot_token):
-        return None
-    return parse_telegram_user(init_data)
@@ -1,12 +1,10 @@
 """Telegram webhook microservice (echo-only placeholder)."""
-from fastapi import FastAPI
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.concurrency import run_in_threadpool
 
 from backend.db.chat_history import (
     ensure_tables as ensure_chat_tables,
-    clear_history_if_limit,
-    get_or_create_session,
-    save_message,
-    touch_session,
+    record_user_message,
 )
 from backend.db import chat_analytics
 
@@ -17,18 +15,13 @@ def _extract_message(payload: dict) -> tuple[int | None, int | None, str | None]
     message = payload.get("message") or payload.get("edited_message")
     if not isinstance(message, dict):
         return None, None, None
-    chat = message.get("chat") if isinstance(message.get("chat"), dict) else {}
+    chat = message.get("chat")
     chat_id = chat.get("id") if isinstance(chat, dict) else None
-    text = message.get("text")
-    from_user = message.get("from") if isinstance(message.get("from"), dict) else None
-    telegram_id = None
-    if isinstance(from_user, dict):
-        from_id = from_user.get("id")
-        if isinstance(from_id, int):
-            telegram_id = from_id
-    if telegram_id is None:
+    from_user = message.get("from")
+    telegram_id = from_user.get("id") if isinstance(from_user, dict) else None
+    if not isinstance(telegram_id, int):
         telegram_id = chat_id
-    return chat_id, telegram_id, text
+    return chat_id, telegram_id, message.get("text")
 
 
 @app.on_event("startup")
@@ -42,42 +35,41 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+def _save_echo_event(session_id: str, telegram_id: int, chat_id: int, text: str) -> None:
+    try:
+        chat_analytics.save_chat_event(
+            session_id=session_id,
+            telegram_id=telegram_id,
+            person_id=None,
+            channel="telegram",
+            query=text,
+            response=text,
+            llm_model=None,
+            llm_used=False,
+            llm_error=None,
+            intents=[],
+            agents=[],
+            trace=[],
+            metadata={"chat_id": chat_id, "source": "telegram_webhook_echo"},
+        )
+    except Exception:
+        pass
+
+
 @app.post("/webhook")
-async def webhook(payload: dict) -> dict:
+async def webhook(payload: dict, background_tasks: BackgroundTasks) -> dict:
     """Temporary echo handler for Telegram updates."""
     chat_id, telegram_id, text = _extract_message(payload)
     if not text:
         return {"status": "ignored", "reason": "no_text", "chat_id": chat_id}
     if chat_id is not None and telegram_id is not None:
-        session_id = get_or_create_session(
-            telegram_id=telegram_id,
-            chat_id=chat_id,
-        )
-        save_message(
-            session_id=session_id,
+        session_id = await run_in_threadpool(
+            record_user_message,
             telegram_id=telegram_id,
             chat_id=chat_id,
-            role="user",
             content=text,
+            history_limit=5,
         )
-        touch_session(session_id)
-        clear_history_if_limit(session_id, limit=5)
-        try:
-            chat_analytics.save_chat_event(
-                session_id=session_id,
-                telegram_id=telegram_id,
-                person_id=None,
-                channel="telegram",
-                query=text,
-                response=text,
-                llm_model=None,
-                llm_used=False,
-                llm_error=None,
-                intents=[],
-                agents=[],
-                trace=[],
-                metadata={"chat_id": chat_id, "source": "telegram_webhook_echo"},
-            )
-        except Exception:
-            pass
+        # Analytics is written after the response so Telegram gets its ack sooner.
+        background_tasks.add_task(_save_echo_event, session_id, telegram_id, chat_id, text)
     return {"status": "ok", "chat_id": chat_id, "echo": text}
@@ -1,22 +1,79 @@
 """Telegram long-polling worker (echo-only placeholder)."""
+from __future__ import annotations
+
 import asyncio
+import json
 import logging
 import os
 import re
-import time
+import signal
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
-import requests
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx; pinned via httpx[http2]
+except ImportError:  # pragma: no cover - optional dependency
+    h2 = None
 
 from backend.db.chat_history import (
     ensure_tables as ensure_chat_tables,
-    clear_history_if_limit,
     get_or_create_session,
-    save_message,
-    touch_session,
+    save_turn,
 )
 from backend.db import chat_analytics
 from backend.db.telegram_users import ensure_table, get_or_create_user
-from backend.orchestrator.router import AgentRouter
+from backend.services.ttl_cache import TTLCache
+
+if TYPE_CHECKING:
+    from backend.orchestrator.router import AgentRouter
+
+
+# Tags grouped by their replacement, one alternation per group, so a reply is
+# rewritten in a few C-level passes. The catch-all runs last and strips every
+# remaining tag, including <a>, <strong>, <em>, <code> and <pre>.
+_NEWLINE_TAG_RE = re.compile(
+    r"<\s*br\s*/?>"
+    r"|<\s*/?h[1-6]\s*>"
+    r"|<\s*/\s*li\s*>"
+    r"|<\s*/?(?:ul|ol)\s*>"
+    r"|<\s*(?:/\s*)?blockquote\s*>"
+    r"|<\s*(?:table|thead|tbody|tr|th|td)[^<>]*>"
+    r"|</\s*(?:table|thead|tbody|tr|th|td)\s*>"
+    r"|</?(?:span|div|section|article|header|footer|main)[^<>]*>",
+    re.IGNORECASE,
+)
+_PARAGRAPH_TAG_RE = re.compile(r"<\s*/?p\s*>", re.IGNORECASE)
+_LIST_ITEM_TAG_RE = re.compile(r"<\s*li\s*>", re.IGNORECASE)
+_ANY_TAG_RE = re.compile(r"<[^>]+>")
+_NL3_RE = re.compile(r"\n{3,}")
+
+# Worker threads each keep one event loop for route() across messages.
+_thread_state = threading.local()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# (telegram_id, chat_id) -> session id. Sessions are only ever created when
+# none exists, so the latest one stays valid until a write against it fails.
+_session_cache: TTLCache[str] = TTLCache(
+    maxsize=int(os.getenv("TELEGRAM_SESSION_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TELEGRAM_SESSION_CACHE_TTL", "300")),
+)
+# telegram_id -> user row, authorized users only: sign-in happens in the API
+# process, so an unauthorized row is re-read until platonus_auth flips.
+_user_cache: TTLCache[dict] = TTLCache(
+    maxsize=int(os.getenv("TELEGRAM_USER_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TELEGRAM_USER_CACHE_TTL", "300")),
+)
 
 
 def _get_env_int(name: str, default: int) -> int:
@@ -43,14 +100,33 @@ def _extract_message(update: dict) -> tuple[int | None, str | None, dict | None]
     message = update.get("message") or update.get("edited_message")
     if not isinstance(message, dict):
         return None, None, None
-    chat = message.get("chat") if isinstance(message.get("chat"), dict) else {}
+    chat = message.get("chat")
     chat_id = chat.get("id") if isinstance(chat, dict) else None
-    text = message.get("text")
-    from_user = message.get("from") if isinstance(message.get("from"), dict) else None
-    return chat_id, text, from_user
+    from_user = message.get("from")
+    return chat_id, message.get("text"), from_user if isinstance(from_user, dict) else None
+
 
+def _json_dumps(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
 
-def _send_message(
+
+def _build_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by long polling and replies."""
+    # Transport retries cover connection failures only, so a reply is never
+    # sent twice. Over HTTP/2 the long poll and the sender tasks share one
+    # multiplexed connection.
+    transport = httpx.AsyncHTTPTransport(
+        http2=h2 is not None,
+        retries=2,
+        limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+    )
+    return httpx.AsyncClient(transport=transport)
+
+
+async def _send_message(
+    client: httpx.AsyncClient,
     base_url: str,
     chat_id: int,
     text: str,
@@ -62,44 +138,66 @@ def _send_message(
         payload["parse_mode"] = parse_mode
     if reply_markup:
         payload["reply_markup"] = reply_markup
-    response = requests.post(
+    response = await client.post(
         f"{base_url}/sendMessage",
-        json=payload,
+        content=_json_dumps(payload),
+        headers=_JSON_HEADERS,
         timeout=10,
     )
     try:
         response.raise_for_status()
-    except requests.HTTPError as exc:
-        raise requests.HTTPError(f"{exc} | response={response.text}") from exc
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(f"{exc} | response={response.text}") from exc
+
+
+class _ReplySender:
+    """Sends replies from background tasks so handlers never wait on Telegram.
+
+    Each chat maps to one queue, so its messages keep their order.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, base_url: str, workers: int) -> None:
+        self._client = client
+        self._base_url = base_url
+        self._queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=1000) for _ in range(workers)]
+        self._tasks = [asyncio.create_task(self._drain(queue)) for queue in self._queues]
+
+    async def send(
+        self,
+        chat_id: int,
+        text: str,
+        reply_markup: dict | None = None,
+        parse_mode: str | None = "HTML",
+    ) -> None:
+        queue = self._queues[chat_id % len(self._queues)]
+        await queue.put((chat_id, text, reply_markup, parse_mode))
+
+    async def _drain(self, queue: asyncio.Queue) -> None:
+        while True:
+            chat_id, text, reply_markup, parse_mode = await queue.get()
+            try:
+                await _send_message(
+                    self._client, self._base_url, chat_id, text, reply_markup, parse_mode
+                )
+            except Exception as exc:
+                logging.getLogger("telegram").warning("Telegram send failed: %s", exc)
+            finally:
+                queue.task_done()
 
 
 def _normalize_telegram_html(text: str) -> str:
     if not text:
         return text
-    normalized = text
-    normalized = re.sub(r"<\s*br\s*/?>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/?p\s*>", "\n\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/?h[1-6]\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*li\s*>", "- ", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*li\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/?ul\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/?ol\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*strong\s*>", "<b>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*strong\s*>", "</b>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*em\s*>", "<i>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*em\s*>", "</i>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*blockquote\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*blockquote\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*code\s*>", "<code>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*code\s*>", "</code>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*pre\s*>", "<pre>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*/\s*pre\s*>", "</pre>", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<\s*(table|thead|tbody|tr|th|td)[^>]*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"</\s*(table|thead|tbody|tr|th|td)\s*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"</?(span|div|section|article|header|footer|main)[^>]*>", "\n", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"</?(?:a)[^>]*>", "", normalized, flags=re.IGNORECASE)
-    normalized = re.sub(r"<[^>]+>", "", normalized)
-    normalized = re.sub(r"\n{3,}", "\n\n", normalized)
+    if "<" not in text:
+        # Plain-text answer: only the blank-line collapse can apply.
+        if "\n\n\n" in text:
+            text = _NL3_RE.sub("\n\n", text)
+        return text.strip()
+    normalized = _NEWLINE_TAG_RE.sub("\n", text)
+    normalized = _PARAGRAPH_TAG_RE.sub("\n\n", normalized)
+    normalized = _LIST_ITEM_TAG_RE.sub("- ", normalized)
+    normalized = _ANY_TAG_RE.sub("", normalized)
+    normalized = _NL3_RE.sub("\n\n", normalized)
     return normalized.strip()
 
 
@@ -115,12 +213,234 @@ def _build_ai_payload(message: str, telegram_id: int | None) -> dict:
     }
 
 
-def _run_ai_chat(agent_router: AgentRouter, message: str, telegram_id: int | None) -> dict:
+def _build_auth_reply(mini_app_url: str) -> tuple[str, dict | None]:
+    """Text and inline keyboard sent to users who have not signed in yet."""
+    auth_text = "Authorization required. Please sign in via the mini app."
+    if not mini_app_url:
+        return auth_text, None
+    if mini_app_url.startswith("https://"):
+        button = {"text": "Open mini app", "web_app": {"url": mini_app_url}}
+        return auth_text, {"inline_keyboard": [[button]]}
+    logging.getLogger("telegram").warning(
+        "TELEGRAM_MINI_APP_URL is not https://; using url button fallback: %s",
+        mini_app_url,
+    )
+    button = {"text": "Open link", "url": mini_app_url}
+    return f"{auth_text}\n{mini_app_url}", {"inline_keyboard": [[button]]}
+
+
+async def _get_session_id(telegram_id: int, chat_id: int) -> str:
+    key = (telegram_id, chat_id)
+    session_id = _session_cache.get(key)
+    if session_id is None:
+        session_id = await asyncio.to_thread(
+            get_or_create_session,
+            telegram_id=telegram_id,
+            chat_id=chat_id,
+        )
+        _session_cache.put(key, session_id)
+    return session_id
+
+
+async def _get_user(telegram_id: int, profile: dict) -> dict:
+    user = _user_cache.get(telegram_id)
+    if user is None:
+        user = await asyncio.to_thread(
+            get_or_create_user,
+            telegram_id=telegram_id,
+            username=profile.get("username"),
+            first_name=profile.get("first_name"),
+            last_name=profile.get("last_name"),
+        )
+        if user["platonus_auth"]:
+            _user_cache.put(telegram_id, user)
+    return user
+
+
+async def _save_turn(
+    *,
+    session_id: str,
+    telegram_id: int,
+    chat_id: int,
+    user_text: str,
+    assistant_text: str,
+) -> bool:
+    try:
+        return await asyncio.to_thread(
+            save_turn,
+            session_id=session_id,
+            telegram_id=telegram_id,
+            chat_id=chat_id,
+            user_text=user_text,
+            assistant_text=assistant_text,
+        )
+    except Exception:
+        # The cached session may be gone; look it up again next time.
+        _session_cache.pop((telegram_id, chat_id))
+        raise
+
+
+def _build_router() -> AgentRouter:
+    # Importing the router builds the RAG service, so keep it off the startup path.
+    from backend.orchestrator.router import AgentRouter
+
+    return AgentRouter()
+
+
+def _route_blocking(agent_router: AgentRouter, payload: dict) -> dict:
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop.run_until_complete(agent_router.route(payload))
+
+
+async def _run_ai_chat(
+    router_task: asyncio.Task[AgentRouter], message: str, telegram_id: int | None
+) -> dict:
     payload = _build_ai_payload(message, telegram_id)
-    return asyncio.run(agent_router.route(payload)) or {}
+    # Messages that arrive while the router is still loading wait here.
+    agent_router = await router_task
+    # route() makes blocking LLM calls (requests.post), so it runs in a worker
+    # thread on that thread's persistent loop instead of stalling the poller's.
+    return await asyncio.to_thread(_route_blocking, agent_router, payload) or {}
+
+
+async def _handle_update(
+    sender: _ReplySender,
+    router_task: asyncio.Task[AgentRouter],
+    auth_reply: tuple[str, dict | None],
+    chat_id: int,
+    text: str,
+    from_user: dict | None,
+) -> None:
+    logger = logging.getLogger("telegram")
+    # _extract_message guarantees a dict or None.
+    profile = from_user or {}
+    from_id = profile.get("id")
+    telegram_id = from_id if isinstance(from_id, int) else chat_id
+
+    # psycopg2 calls block, so cache misses run in worker threads off the event loop.
+    session_id = await _get_session_id(telegram_id, chat_id)
+    user = await _get_user(telegram_id, profile)
+    if not user["platonus_auth"]:
+        auth_text, reply_markup = auth_reply
+        if await _save_turn(
+            session_id=session_id,
+            telegram_id=telegram_id,
+            chat_id=chat_id,
+            user_text=text,
+            assistant_text=auth_text,
+        ):
+            await sender.send(
+                chat_id,
+                "История чата очищена.",
+                parse_mode=None,
+            )
+        chat_analytics.save_chat_event(
+            session_id=session_id,
+            telegram_id=telegram_id,
+            person_id=user.get("platonus_person_id"),
+            channel="telegram",
+            query=text,
+            response=auth_text,
+            llm_model=None,
+            llm_used=False,
+            llm_error=None,
+            intents=[],
+            agents=[],
+            trace=[],
+            metadata={"chat_id": chat_id},
+        )
+        await sender.send(chat_id, auth_text, reply_markup, parse_mode=None)
+        return
+
+    try:
+        result = await _run_ai_chat(router_task, text, telegram_id)
+        answer = result.get("final_answer") or "Ответ временно недоступен."
+    except Exception as exc:
+        logger.warning("AI chat failed: %s", exc)
+        answer = "Не удалось получить ответ. Попробуйте позже."
+        result = {
+            "query": text,
+            "final_answer": answer,
+            "intents": [],
+            "plan": [],
+            "trace": [],
+            "llm": {"model": None, "used": False, "error": str(exc)},
+        }
+    if await _save_turn(
+        session_id=session_id,
+        telegram_id=telegram_id,
+        chat_id=chat_id,
+        user_text=text,
+        assistant_text=answer,
+    ):
+        await sender.send(
+            chat_id,
+            "История чата очищена.",
+            parse_mode=None,
+        )
+    chat_analytics.save_chat_event(
+        session_id=session_id,
+        telegram_id=telegram_id,
+        person_id=user.get("platonus_person_id"),
+        channel="telegram",
+        query=text,
+        response=answer,
+        llm_model=(result.get("llm") or {}).get("model"),
+        llm_used=(result.get("llm") or {}).get("used"),
+        llm_error=(result.get("llm") or {}).get("error"),
+        intents=result.get("intents"),
+        agents=result.get("plan"),
+        trace=result.get("trace"),
+        metadata={"chat_id": chat_id},
+    )
+    safe_answer = _normalize_telegram_html(answer)
+    await sender.send(chat_id, safe_answer, parse_mode="HTML")
+
+
+async def _handle_chat(
+    sender: _ReplySender,
+    router_task: asyncio.Task[AgentRouter],
+    auth_reply: tuple[str, dict | None],
+    semaphore: asyncio.Semaphore,
+    backlogs: dict[int, deque[tuple[str, dict | None]]],
+    chat_id: int,
+) -> None:
+    """Drain one chat's backlog in order; a failure skips only that message.
+
+    Later polls append to the same deque, so the chat is never handled by two
+    tasks at once. The entry is removed with no await after the final empty
+    check, so the poller either extends a live backlog or starts a new task.
+    """
+    messages = backlogs[chat_id]
+    try:
+        while messages:
+            text, from_user = messages.popleft()
+            # The slot covers this message's route() thread, capping concurrent
+            # LLM calls while letting other chats in between messages.
+            async with semaphore:
+                try:
+                    await _handle_update(
+                        sender, router_task, auth_reply, chat_id, text, from_user
+                    )
+                except Exception as exc:
+                    logging.getLogger("telegram").warning("Telegram update failed: %s", exc)
+    finally:
+        del backlogs[chat_id]
+
+
+def _flush_and_exit() -> None:
+    """SIGTERM handler: atexit hooks do not run when the process is killed."""
+    try:
+        chat_analytics.flush_chat_events()
+    except Exception as exc:
+        logging.getLogger("telegram").warning("Chat analytics flush on shutdown failed: %s", exc)
+    raise SystemExit(0)
 
 
-def run() -> None:
+async def run() -> None:
     logging.basicConfig(level=logging.INFO)
     token = os.getenv("TELEGRAM_BOT_TOKEN", "").strip()
     if not token:
@@ -129,183 +449,72 @@ def run() -> None:
     ensure_table()
     ensure_chat_tables()
     chat_analytics.ensure_tables()
-    agent_router = AgentRouter()
 
     base_url = f"https://api.telegram.org/bot{token}"
     mini_app_url = os.getenv("TELEGRAM_MINI_APP_URL", "https://academiq.tau-edu.kz").strip()
+    auth_reply = _build_auth_reply(mini_app_url)
     poll_timeout = _get_env_int("TELEGRAM_POLL_TIMEOUT", 20)
     poll_interval = _get_env_float("TELEGRAM_POLL_INTERVAL", 1.0)
+    concurrency = max(1, _get_env_int("TELEGRAM_CONCURRENCY", 8))
+    semaphore = asyncio.Semaphore(concurrency)
+    # One thread per concurrent route() plus headroom for the psycopg2 calls,
+    # so blocking LLM requests never starve the DB work of other chats.
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=concurrency + 8, thread_name_prefix="telegram")
+    )
+    router_task = asyncio.create_task(asyncio.to_thread(_build_router))
+    # Container stops send SIGTERM; write out buffered analytics before exiting.
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, _flush_and_exit)
 
     offset = 0
+    # Pending messages per chat that has a running handler task; tasks are kept
+    # referenced until done so the loop does not garbage-collect them.
+    backlogs: dict[int, deque[tuple[str, dict | None]]] = {}
+    chat_tasks: set[asyncio.Task[None]] = set()
     logger = logging.getLogger("telegram")
     logger.info("Starting Telegram long-polling.")
 
-    while True:
-        try:
-            response = requests.post(
-                f"{base_url}/getUpdates",
-                json={"timeout": poll_timeout, "offset": offset},
-                timeout=poll_timeout + 5,
-            )
-            response.raise_for_status()
-            data = response.json()
-            updates = data.get("result") or []
-            for update in updates:
-                if not isinstance(update, dict):
-                    continue
-                update_id = update.get("update_id")
-                if isinstance(update_id, int):
-                    offset = update_id + 1
-                chat_id, text, from_user = _extract_message(update)
-                if chat_id is None or not text:
-                    continue
-                telegram_id = None
-                if isinstance(from_user, dict):
-                    from_id = from_user.get("id")
-                    if isinstance(from_id, int):
-                        telegram_id = from_id
-                if telegram_id is None:
-                    telegram_id = chat_id
-
-                session_id = get_or_create_session(
-                    telegram_id=telegram_id,
-                    chat_id=chat_id,
+    async with _build_client() as client:
+        sender = _ReplySender(client, base_url, max(1, _get_env_int("TELEGRAM_SEND_WORKERS", 4)))
+        while True:
+            if router_task.done() and router_task.exception() is not None:
+                # Fail the worker as a synchronous AgentRouter() would have.
+                raise router_task.exception()
+            try:
+                response = await client.post(
+                    f"{base_url}/getUpdates",
+                    content=_json_dumps({"timeout": poll_timeout, "offset": offset}),
+                    headers=_JSON_HEADERS,
+                    timeout=poll_timeout + 5,
                 )
-                save_message(
-                    session_id=session_id,
-                    telegram_id=telegram_id,
-                    chat_id=chat_id,
-                    role="user",
-                    content=text,
-                )
-                touch_session(session_id)
-
-                user = get_or_create_user(
-                    telegram_id=telegram_id,
-                    username=from_user.get("username") if isinstance(from_user, dict) else None,
-                    first_name=from_user.get("first_name") if isinstance(from_user, dict) else None,
-                    last_name=from_user.get("last_name") if isinstance(from_user, dict) else None,
-                )
-                if not user["platonus_auth"]:
-                    auth_text = "Authorization required. Please sign in via the mini app."
-                    reply_markup = None
-                    if mini_app_url:
-                        if mini_app_url.startswith("https://"):
-                            reply_markup = {
-                                "inline_keyboard": [
-                                    [
-                                        {
-                                            "text": "Open mini app",
-                                            "web_app": {"url": mini_app_url},
-                                        }
-                                    ]
-                                ]
-                            }
-                        else:
-                            reply_markup = {
-                                "inline_keyboard": [
-                                    [
-                                        {
-                                            "text": "Open link",
-                                            "url": mini_app_url,
-                                        }
-                                    ]
-                                ]
-                            }
-                            auth_text = f"{auth_text}\n{mini_app_url}"
-                            logger.warning(
-                                "TELEGRAM_MINI_APP_URL is not https://; using url button fallback: %s",
-                                mini_app_url,
-                            )
-                    save_message(
-                        session_id=session_id,
-                        telegram_id=telegram_id,
-                        chat_id=chat_id,
-                        role="assistant",
-                        content=auth_text,
+                response.raise_for_status()
+                data = _json_loads(response.content)
+                updates = data.get("result") or []
+                # Chats run concurrently and the next poll starts right away;
+                # messages within one chat keep their order across polls.
+                for update in updates:
+                    if not isinstance(update, dict):
+                        continue
+                    update_id = update.get("update_id")
+                    if isinstance(update_id, int):
+                        offset = update_id + 1
+                    chat_id, text, from_user = _extract_message(update)
+                    if chat_id is None or not text:
+                        continue
+                    backlog = backlogs.get(chat_id)
+                    if backlog is not None:
+                        backlog.append((text, from_user))
+                        continue
+                    backlogs[chat_id] = deque([(text, from_user)])
+                    task = asyncio.create_task(
+                        _handle_chat(sender, router_task, auth_reply, semaphore, backlogs, chat_id)
                     )
-                    touch_session(session_id)
-                    if clear_history_if_limit(session_id, limit=5):
-                        _send_message(
-                            base_url,
-                            chat_id,
-                            "История чата очищена.",
-                            parse_mode=None,
-                        )
-                    try:
-                        chat_analytics.save_chat_event(
-                            session_id=session_id,
-                            telegram_id=telegram_id,
-                            person_id=user.get("platonus_person_id"),
-                            channel="telegram",
-                            query=text,
-                            response=auth_text,
-                            llm_model=None,
-                            llm_used=False,
-                            llm_error=None,
-                            intents=[],
-                            agents=[],
-                            trace=[],
-                            metadata={"chat_id": chat_id},
-                        )
-                    except Exception as exc:
-                        logger.warning("Chat analytics failed: %s", exc)
-                    _send_message(base_url, chat_id, auth_text, reply_markup, parse_mode=None)
-                    continue
-
-                try:
-                    result = _run_ai_chat(agent_router, text, telegram_id)
-                    answer = result.get("final_answer") or "Ответ временно недоступен."
-                except Exception as exc:
-                    logger.warning("AI chat failed: %s", exc)
-                    answer = "Не удалось получить ответ. Попробуйте позже."
-                    result = {
-                        "query": text,
-                        "final_answer": answer,
-                        "intents": [],
-                        "plan": [],
-                        "trace": [],
-                        "llm": {"model": None, "used": False, "error": str(exc)},
-                    }
-                save_message(
-                    session_id=session_id,
-                    telegram_id=telegram_id,
-                    chat_id=chat_id,
-                    role="assistant",
-                    content=answer,
-                )
-                touch_session(session_id)
-                if clear_history_if_limit(session_id, limit=5):
-                    _send_message(
-                        base_url,
-                        chat_id,
-                        "История чата очищена.",
-                        parse_mode=None,
-                    )
-                try:
-                    chat_analytics.save_chat_event(
-                        session_id=session_id,
-                        telegram_id=telegram_id,
-                        person_id=user.get("platonus_person_id"),
-                        channel="telegram",
-                        query=text,
-                        response=answer,
-                        llm_model=(result.get("llm") or {}).get("model"),
-                        llm_used=(result.get("llm") or {}).get("used"),
-                        llm_error=(result.get("llm") or {}).get("error"),
-                        intents=result.get("intents"),
-                        agents=result.get("plan"),
-                        trace=result.get("trace"),
-                        metadata={"chat_id": chat_id},
-                    )
-                except Exception as exc:
-                    logger.warning("Chat analytics failed: %s", exc)
-                safe_answer = _normalize_telegram_html(answer)
-                _send_message(base_url, chat_id, safe_answer, parse_mode="HTML")
-        except Exception as exc:
-            logger.warning("Telegram polling error: %s", exc)
-            time.sleep(poll_interval)
+                    chat_tasks.add(task)
+                    task.add_done_callback(chat_tasks.discard)
+            except Exception as exc:
+                logger.warning("Telegram polling error: %s", exc)
+                await asyncio.sleep(poll_interval)
 
 
 if __name__ == "__main__":
-    run()
+    asyncio.run(run())
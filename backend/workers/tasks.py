@@ -50,7 +50,7 @@ def ingest_documents(
             stored_file=stored_file,
         )
         if document_id and file_id:
-            rag_documents.create_document(
+            rag_documents.finish_ingestion(
                 document_id=document_id,
                 file_id=file_id,
                 job_id=job_id,
@@ -58,7 +58,7 @@ def ingest_documents(
                 size_bytes=file_path.stat().st_size,
                 metadata=db_metadata,
             )
-        if job_id:
+        elif job_id:
             rag_documents.update_job_status(job_id=job_id, status="ingested", finished=True)
         return {"status": "ingested", **result}
     except Exception as exc:  # pragma: no cover - Celery will log
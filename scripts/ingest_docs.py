@@ -7,8 +7,8 @@ from backend.rag.service import RAGService
 def ingest(path: str) -> None:
     service = RAGService()
     file_path = Path(path)
-    data = file_path.read_bytes()
-    result = service.ingest_upload(filename=file_path.name, data=data)
+    with file_path.open("rb") as stream:
+        result = service.ingest_upload(filename=file_path.name, data=stream)
     print(
         f"Ingested {result['chunks']} chunks from {result['file_name']} "
         f"(document_id={result['document_id']})"